@@ -26,7 +26,7 @@ app_license = "mit"
 
 # include js, css files in header of desk.html
 # app_include_css = "/assets/management_reports_app/css/management_reports_app.css"
-# app_include_js = "/assets/management_reports_app/js/management_reports_app.js"
+app_include_js = "/assets/management_reports_app/js/report_progress.js"
 
 # include js, css files in header of web template
 # web_include_css = "/assets/management_reports_app/css/management_reports_app.css"
@@ -137,17 +137,90 @@ app_license = "mit"
 # ---------------
 # Hook on document methods and events
 
-# doc_events = {
-# 	"*": {
-# 		"on_update": "method",
-# 		"on_cancel": "method",
-# 		"on_trash": "method"
-# 	}
-# }
+doc_events = {
+	"Account": {
+		"on_update": [
+			"management_reports_app.mgt_reports.account_tree.clear_account_tree_cache",
+			"management_reports_app.mgt_reports.pl_classification.clear_pl_classification_cache",
+			"management_reports_app.mgt_reports.pl_layout.clear_pl_layout_cache",
+		],
+		"on_trash": [
+			"management_reports_app.mgt_reports.account_tree.clear_account_tree_cache",
+			"management_reports_app.mgt_reports.pl_classification.clear_pl_classification_cache",
+			"management_reports_app.mgt_reports.pl_layout.clear_pl_layout_cache",
+			# a deleted account does not move the Account watermark
+			"management_reports_app.mgt_reports.result_cache.clear_result_cache",
+		],
+		"after_rename": [
+			"management_reports_app.mgt_reports.account_tree.clear_account_tree_cache",
+			"management_reports_app.mgt_reports.pl_classification.clear_pl_classification_cache",
+			"management_reports_app.mgt_reports.pl_layout.clear_pl_layout_cache",
+		],
+	},
+	"GL Entry": {
+		"on_submit": "management_reports_app.mgt_reports.account_balance.on_gl_entry_submit",
+	},
+	"Sales Invoice": {
+		"on_submit": [
+			"management_reports_app.mgt_reports.item_sales.on_sales_invoice_submit",
+			"management_reports_app.mgt_reports.item_variance.clear_item_variance_cache",
+		],
+		"on_cancel": [
+			"management_reports_app.mgt_reports.item_sales.on_sales_invoice_cancel",
+			"management_reports_app.mgt_reports.item_variance.clear_item_variance_cache",
+		],
+	},
+	"Item Group": {
+		"on_update": [
+			"management_reports_app.mgt_reports.item_group_tree.clear_item_group_tree_cache",
+			"management_reports_app.mgt_reports.item_variance.clear_item_variance_cache",
+			# rolled up results do not move the ITEM_SOURCES watermark
+			"management_reports_app.mgt_reports.result_cache.clear_result_cache",
+		],
+		"on_trash": [
+			"management_reports_app.mgt_reports.item_group_tree.clear_item_group_tree_cache",
+			"management_reports_app.mgt_reports.item_variance.clear_item_variance_cache",
+			# rolled up results do not move the ITEM_SOURCES watermark
+			"management_reports_app.mgt_reports.result_cache.clear_result_cache",
+		],
+		"after_rename": [
+			"management_reports_app.mgt_reports.item_group_tree.clear_item_group_tree_cache",
+			"management_reports_app.mgt_reports.item_variance.clear_item_variance_cache",
+			# rolled up results do not move the ITEM_SOURCES watermark
+			"management_reports_app.mgt_reports.result_cache.clear_result_cache",
+		],
+	},
+	"Volume Budget": {
+		"on_submit": "management_reports_app.mgt_reports.item_variance.clear_item_variance_cache",
+		"on_cancel": "management_reports_app.mgt_reports.item_variance.clear_item_variance_cache",
+		"on_update_after_submit": "management_reports_app.mgt_reports.item_variance.clear_item_variance_cache",
+	},
+	# budget phasing; Monthly Distribution has no company, so it cannot be a watermark
+	"Monthly Distribution": {
+		"on_update": [
+			"management_reports_app.mgt_reports.item_variance.clear_item_variance_cache",
+			"management_reports_app.mgt_reports.result_cache.clear_result_cache",
+		],
+		"on_trash": [
+			"management_reports_app.mgt_reports.item_variance.clear_item_variance_cache",
+			"management_reports_app.mgt_reports.result_cache.clear_result_cache",
+		],
+		"after_rename": [
+			"management_reports_app.mgt_reports.item_variance.clear_item_variance_cache",
+			"management_reports_app.mgt_reports.result_cache.clear_result_cache",
+		],
+	},
+}
 
 # Scheduled Tasks
 # ---------------
 
+scheduler_events = {
+	"daily_long": [
+		"management_reports_app.mgt_reports.account_balance.reconcile_account_balances",
+	],
+}
+
 # scheduler_events = {
 # 	"all": [
 # 		"management_reports_app.tasks.all"
@@ -174,9 +247,9 @@ app_license = "mit"
 # Overriding Methods
 # ------------------------------
 #
-# override_whitelisted_methods = {
-# 	"frappe.desk.doctype.event.event.get_events": "management_reports_app.event.get_events"
-# }
+override_whitelisted_methods = {
+	"frappe.desk.query_report.run": "management_reports_app.mgt_reports.report_execution.run"
+}
 #
 # each overriding function accepts a `data` argument;
 # generated from the base implementation of the doctype dashboard,
@@ -0,0 +1,280 @@
+# Copyright (c) 2025, kunleadenuga and contributors
+# For license information, please see license.txt
+
+import hashlib
+
+import frappe
+from frappe.utils import flt, get_first_day, get_last_day, getdate, now
+
+from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import get_accounting_dimensions
+from erpnext.accounts.report.financial_statements import get_cost_centers_with_children
+
+# months of reposted GL Entries to rebuild before the repost commits, see queue_month_rebuild
+REPOSTED_MONTHS_FLAG = "mgt_reports_reposted_months"
+
+# last run of reconcile_account_balances, a global default
+RECONCILED_UPTO_KEY = "mgt_reports_balances_reconciled_upto"
+
+
+def on_gl_entry_submit(doc, method=None):
+    """Add a submitted GL Entry to its month bucket.
+
+    Cancelling a voucher posts reversal entries with debit and credit swapped and
+    is_cancelled set, so those are taken back out of the original bucket. Reposts delete
+    the voucher's earlier entries in SQL, without events, so their month is rebuilt
+    instead (see queue_month_rebuild)."""
+    if is_repost(doc):
+        queue_month_rebuild(doc)
+    elif doc.is_cancelled:
+        update_account_balance(doc, -flt(doc.credit), -flt(doc.debit))
+    else:
+        update_account_balance(doc, flt(doc.debit), flt(doc.credit))
+
+
+def is_repost(doc):
+    # Repost Item Valuation posts with from_repost, Repost Accounting Ledger sets a flag
+    return doc.flags.from_repost or frappe.flags.through_repost_accounting_ledger
+
+
+def queue_month_rebuild(doc):
+    """Rebuild the month of a reposted GL Entry before the repost commits, once the
+    voucher's earlier entries are gone. A repost keeps the voucher's posting date, so its
+    old and new entries fall in the same month"""
+    key = (doc.company, doc.fiscal_year, get_first_day(doc.posting_date))
+    months = frappe.flags.setdefault(REPOSTED_MONTHS_FLAG, set())
+    if key in months:
+        return
+
+    months.add(key)
+    frappe.db.before_commit.add(rebuild_reposted_months)
+    frappe.db.after_rollback.add(lambda: frappe.flags.pop(REPOSTED_MONTHS_FLAG, None))
+
+
+def rebuild_reposted_months():
+    for company, fiscal_year, month_start in frappe.flags.pop(REPOSTED_MONTHS_FLAG, None) or ():
+        rebuild_account_balances(company, fiscal_year, month_start)
+
+
+def update_account_balance(doc, debit, credit):
+    if doc.voucher_type == "Period Closing Voucher" or not (debit or credit):
+        return
+
+    if frappe.get_cached_value("Account", doc.account, "report_type") != "Profit and Loss":
+        return
+
+    posting_date = getdate(doc.posting_date)
+    key = (
+        doc.company,
+        doc.account,
+        doc.cost_center or "",
+        doc.finance_book or "",
+        doc.fiscal_year,
+        posting_date.year,
+        posting_date.month,
+    )
+    timestamp = now()
+
+    frappe.db.sql(
+        """
+        insert into `tabMGT Monthly Account Balance`
+            (name, creation, modified, modified_by, owner, docstatus, company, account,
+            cost_center, finance_book, fiscal_year, posting_year, posting_month, debit, credit)
+        values
+            (%s, %s, %s, 'Administrator', 'Administrator', 0, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        on duplicate key update
+            debit = debit + values(debit),
+            credit = credit + values(credit),
+            modified = values(modified)
+    """,
+        (get_bucket_name(key), timestamp, timestamp, *key, debit, credit),
+    )
+
+
+def get_bucket_name(key):
+    """Deterministic name per bucket, matching the sha1 used by rebuild_account_balances"""
+    return hashlib.sha1("|".join(str(k) for k in key).encode()).hexdigest()
+
+
+def rebuild_account_balances(company=None, fiscal_year=None, posting_date=None):
+    """Recompute the month buckets from GL Entry, optionally for one company / fiscal year
+    and the month of posting_date"""
+    conditions = ""
+    values = {"company": company, "fiscal_year": fiscal_year}
+    if company:
+        conditions += " and {0}company = %(company)s"
+    if fiscal_year:
+        conditions += " and {0}fiscal_year = %(fiscal_year)s"
+
+    bucket_conditions, gl_conditions = "", ""
+    if posting_date:
+        posting_date = getdate(posting_date)
+        values.update(
+            posting_year=posting_date.year,
+            posting_month=posting_date.month,
+            from_date=get_first_day(posting_date),
+            to_date=get_last_day(posting_date),
+        )
+        bucket_conditions = " and posting_year = %(posting_year)s and posting_month = %(posting_month)s"
+        gl_conditions = " and gle.posting_date between %(from_date)s and %(to_date)s"
+
+    frappe.db.sql(
+        f"""
+        delete from `tabMGT Monthly Account Balance`
+        where 1=1 {conditions.format("")} {bucket_conditions}
+    """,
+        values,
+    )
+
+    frappe.db.sql(
+        f"""
+        insert into `tabMGT Monthly Account Balance`
+            (name, creation, modified, modified_by, owner, docstatus, company, account,
+            cost_center, finance_book, fiscal_year, posting_year, posting_month, debit, credit)
+        select
+            sha1(concat_ws('|', gle.company, gle.account, ifnull(gle.cost_center, ''),
+                ifnull(gle.finance_book, ''), gle.fiscal_year, year(gle.posting_date),
+                month(gle.posting_date))),
+            now(), now(), 'Administrator', 'Administrator', 0,
+            gle.company, gle.account, ifnull(gle.cost_center, ''), ifnull(gle.finance_book, ''),
+            gle.fiscal_year, year(gle.posting_date), month(gle.posting_date),
+            sum(gle.debit), sum(gle.credit)
+        from `tabGL Entry` gle
+            inner join `tabAccount` acc on acc.name = gle.account
+        where
+            gle.is_cancelled = 0
+            and ifnull(gle.voucher_type, '') != 'Period Closing Voucher'
+            and acc.report_type = 'Profit and Loss'
+            {conditions.format("gle.")} {gl_conditions}
+        group by
+            gle.company, gle.account, ifnull(gle.cost_center, ''), ifnull(gle.finance_book, ''),
+            gle.fiscal_year, year(gle.posting_date), month(gle.posting_date)
+    """,
+        values,
+    )
+
+
+def reconcile_account_balances():
+    """Daily safety net for GL Entry rows removed without document events: rebuilds the
+    fiscal years with GL Entries or completed stock reposts since the last run, and the
+    current one of every company"""
+    reconciled_upto = frappe.db.get_global(RECONCILED_UPTO_KEY)
+    started = now()
+
+    for company, fiscal_year in get_fiscal_years_to_reconcile(reconciled_upto):
+        rebuild_account_balances(company, fiscal_year)
+        frappe.db.commit()
+
+    frappe.db.set_global(RECONCILED_UPTO_KEY, started)
+    frappe.db.commit()
+
+
+def get_fiscal_years_to_reconcile(since=None):
+    """(company, fiscal year) pairs for reconcile_account_balances. A stock repost can
+    drop the GL Entries of a voucher without posting new ones, in any fiscal year from its
+    posting date on"""
+    from erpnext.accounts.utils import get_fiscal_year
+
+    fiscal_years = set()
+    for company in frappe.get_all("Company", pluck="name"):
+        try:
+            fiscal_years.add((company, get_fiscal_year(getdate(), company=company)[0]))
+        except Exception:
+            continue
+
+    if since:
+        fiscal_years.update(
+            frappe.db.sql(
+                """
+                select distinct company, fiscal_year
+                from `tabGL Entry`
+                where modified >= %(since)s
+            """,
+                {"since": since},
+            )
+        )
+        fiscal_years.update(
+            frappe.db.sql(
+                """
+                select distinct riv.company, fy.name
+                from
+                    `tabRepost Item Valuation` riv
+                    inner join `tabFiscal Year` fy on fy.year_end_date >= riv.posting_date
+                where
+                    riv.status = 'Completed'
+                    and riv.modified >= %(since)s
+            """,
+                {"since": since},
+            )
+        )
+
+    return sorted(fiscal_years)
+
+
+def can_use_account_balances(filters):
+    """The summary keeps company, cost center and finance book only"""
+    if filters.get("project"):
+        return False
+
+    return not any(filters.get(dimension) for dimension in get_accounting_dimensions())
+
+
+def get_monthly_balances(filters, period_list, accounts):
+    """Net (debit - credit) per account, fiscal year and month read from the summary table,
+    in the same shape as gl_aggregation.get_account_balances"""
+    conditions = []
+    from_date, to_date = get_first_posting_date(filters, period_list), getdate(period_list[-1].to_date)
+    values = frappe._dict(
+        company=filters.company,
+        accounts=accounts,
+        from_year=from_date.year,
+        to_year=to_date.year,
+        from_month=from_date.year * 12 + from_date.month,
+        to_month=to_date.year * 12 + to_date.month,
+        fiscal_years=list({period.to_date_fiscal_year for period in period_list}),
+    )
+
+    if filters.get("cost_center"):
+        conditions.append("cost_center in %(cost_center)s")
+        values.cost_center = get_cost_centers_with_children(filters.cost_center)
+
+    company_fb = frappe.get_cached_value("Company", filters.company, "default_finance_book")
+    finance_books = [""]
+    if filters.get("finance_book"):
+        finance_books.append(filters.finance_book)
+    if filters.get("include_default_book_entries") and company_fb:
+        finance_books.append(company_fb)
+    conditions.append("finance_book in %(finance_books)s")
+    values.finance_books = finance_books
+
+    balances = frappe.db.sql(
+        f"""
+        select
+            account, fiscal_year, posting_year, posting_month,
+            sum(debit) - sum(credit) as amount
+        from `tabMGT Monthly Account Balance`
+        where
+            company = %(company)s
+            and account in %(accounts)s
+            and fiscal_year in %(fiscal_years)s
+            and posting_year between %(from_year)s and %(to_year)s
+            and posting_year * 12 + posting_month between %(from_month)s and %(to_month)s
+            and {" and ".join(conditions)}
+        group by account, fiscal_year, posting_year, posting_month
+    """,
+        values,
+        as_dict=1,
+    )
+
+    for d in balances:
+        d.posting_date = getdate(f"{int(d.posting_year)}-{int(d.posting_month):02d}-01")
+
+    return balances
+
+
+def get_first_posting_date(filters, period_list):
+    """Earliest posting the periods' values depend on: the start of the first fiscal year
+    when values accumulate, else the start of the first period"""
+    if filters.accumulated_values:
+        return getdate(period_list[0].year_start_date)
+
+    return getdate(period_list[0].from_date)
@@ -0,0 +1,60 @@
+# Copyright (c) 2025, kunleadenuga and contributors
+# For license information, please see license.txt
+
+import frappe
+
+ACCOUNT_TREE_CACHE_KEY = "mgt_reports_account_tree"
+
+
+def get_account_tree(company):
+    """Account index for a company keyed by account name, cached in redis.
+
+    Each entry carries the Account fields the reports need plus root_account (the
+    top of its tree) and top_group (the ancestor directly below root_account)."""
+    tree = frappe.cache().hget(ACCOUNT_TREE_CACHE_KEY, company)
+    if tree is None:
+        tree = build_account_tree(company)
+        frappe.cache().hset(ACCOUNT_TREE_CACHE_KEY, company, tree)
+
+    return tree
+
+
+def build_account_tree(company):
+    accounts = frappe.db.sql(
+        """
+        select
+            name, parent_account, is_group, lft, rgt, root_type, report_type,
+            account_name, account_number, include_in_gross, account_type
+        from `tabAccount`
+        where company = %s
+        order by lft
+    """,
+        company,
+        as_dict=1,
+    )
+
+    tree = {}
+    # ordered by lft, so a parent is always indexed before its children
+    for d in accounts:
+        parent = tree.get(d.parent_account)
+        if not parent:
+            d.root_account = d.name
+            d.top_group = None
+        else:
+            d.root_account = parent.root_account
+            d.top_group = parent.top_group or d.name
+
+        tree[d.name] = d
+
+    return tree
+
+
+def get_budget_parents(tree, account):
+    """Accounts a budget row rolls up to: the top level group above the account (the
+    account itself when it is one) and the root"""
+    d = tree[account]
+    return list(dict.fromkeys(parent for parent in (d.top_group, d.root_account) if parent))
+
+
+def clear_account_tree_cache(doc, method=None, *args):
+    frappe.cache().hdel(ACCOUNT_TREE_CACHE_KEY, doc.company)
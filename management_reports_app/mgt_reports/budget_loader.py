@@ -0,0 +1,100 @@
+# Copyright (c) 2025, kunleadenuga and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe import _
+from frappe.utils import flt
+from frappe.utils.caching import request_cache
+
+from management_reports_app.mgt_reports.account_tree import get_account_tree, get_budget_parents
+from management_reports_app.mgt_reports.progress import report_progress
+
+MONTHS = {
+    "January": "jan",
+    "February": "feb",
+    "March": "mar",
+    "April": "apr",
+    "May": "may",
+    "June": "jun",
+    "July": "jul",
+    "August": "aug",
+    "September": "sep",
+    "October": "oct",
+    "November": "nov",
+    "December": "dec",
+}
+
+# erpnext spreads a budget evenly when it has no Monthly Distribution
+EVEN_PHASING = {month: 100.0 / 12 for month in MONTHS.values()}
+
+
+@request_cache
+def get_budget_matrix(company, fiscal_years, budget_against="Cost Center", months=None):
+    """Submitted budgets phased by month as {fiscal_year: {account: {month: amount}}}.
+
+    This is the only source of budget figures for the GL reports and is computed once
+    per request, so callers get the same (read only) matrix; pass fiscal_years as a tuple.
+
+    Budget rows are rolled up to their top level group and root account (see
+    account_tree.get_budget_parents), which are the accounts the P&L layouts show. Only
+    the months given (a tuple of month keys, all by default) are phased."""
+    budgets = frappe.get_all(
+        "Budget",
+        filters={
+            "company": company,
+            "budget_against": budget_against,
+            "fiscal_year": ["in", list(fiscal_years)],
+            "docstatus": 1,
+        },
+        fields=["name", "fiscal_year", "monthly_distribution"],
+    )
+    if not budgets:
+        return {}
+
+    budget_accounts = frappe.get_all(
+        "Budget Account",
+        filters={"parenttype": "Budget", "parent": ["in", [d.name for d in budgets]]},
+        fields=["parent", "account", "budget_amount"],
+    )
+
+    phasing = get_monthly_phasing({d.monthly_distribution for d in budgets if d.monthly_distribution})
+    budgets = {d.name: d for d in budgets}
+    account_tree = get_account_tree(company)
+
+    rows_by_year = {}
+    for row in budget_accounts:
+        rows_by_year.setdefault(budgets[row.parent].fiscal_year, []).append(row)
+
+    months = months or tuple(MONTHS.values())
+    matrix = {}
+    for i, fiscal_year in enumerate(fiscal_years, 1):
+        for row in rows_by_year.get(fiscal_year, []):
+            budget = budgets[row.parent]
+            budget_phasing = phasing.get(budget.monthly_distribution) or EVEN_PHASING
+            groups = matrix.setdefault(budget.fiscal_year, {})
+
+            for parent_account in get_budget_parents(account_tree, row.account):
+                amounts = groups.setdefault(parent_account, dict.fromkeys(months, 0.0))
+                for month in months:
+                    amounts[month] += flt(row.budget_amount) * budget_phasing.get(month, 0.0) / 100
+
+        report_progress(_("Budgets built for {0} of {1} fiscal years").format(i, len(fiscal_years)))
+
+    return matrix
+
+
+def get_monthly_phasing(distributions):
+    """{Monthly Distribution: {month: percentage_allocation}}"""
+    phasing = {}
+    if not distributions:
+        return phasing
+
+    for d in frappe.get_all(
+        "Monthly Distribution Percentage",
+        filters={"parenttype": "Monthly Distribution", "parent": ["in", list(distributions)]},
+        fields=["parent", "month", "percentage_allocation"],
+    ):
+        phasing.setdefault(d.parent, {})[MONTHS[d.month]] = flt(d.percentage_allocation)
+
+    return phasing
+
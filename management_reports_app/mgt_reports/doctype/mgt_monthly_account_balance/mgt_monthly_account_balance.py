@@ -0,0 +1,15 @@
+# Copyright (c) 2025, kunleadenuga and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class MGTMonthlyAccountBalance(Document):
+    pass
+
+
+def on_doctype_update():
+    frappe.db.add_index("MGT Monthly Account Balance", ["company", "fiscal_year", "account"])
+    # latest change per company, see result_cache.get_data_watermark
+    frappe.db.add_index("MGT Monthly Account Balance", ["company", "modified"])
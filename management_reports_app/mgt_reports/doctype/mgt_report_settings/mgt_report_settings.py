@@ -0,0 +1,47 @@
+# Copyright (c) 2025, kunleadenuga and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe import _
+from frappe.model.document import Document
+
+from management_reports_app.mgt_reports.account_tree import get_account_tree
+from management_reports_app.mgt_reports.pl_classification import (
+    PL_CLASSIFICATION_CACHE_KEY,
+    PL_LINES,
+    is_pl_line_account,
+)
+from management_reports_app.mgt_reports.pl_layout import PL_LAYOUT_CACHE_KEY
+from management_reports_app.mgt_reports.result_cache import clear_result_cache
+
+
+class MGTReportSettings(Document):
+    def validate(self):
+        self.validate_pl_line_mappings()
+
+    def validate_pl_line_mappings(self):
+        accounts = set()
+        for row in self.pl_line_mappings:
+            if row.account in accounts:
+                frappe.throw(_("Row {0}: Account {1} is mapped more than once").format(row.idx, row.account))
+            accounts.add(row.account)
+
+            d = get_account_tree(row.company).get(row.account)
+            if not d or not is_pl_line_account(d):
+                frappe.throw(
+                    _("Row {0}: {1} is not a Profit and Loss root account or a group directly below one").format(
+                        row.idx, row.account
+                    )
+                )
+
+            root_type, is_root_line = PL_LINES[row.pl_line]
+            if d.root_type != root_type or (not d.top_group) != is_root_line:
+                frappe.throw(
+                    _("Row {0}: P&L line {1} cannot be used for {2}").format(row.idx, row.pl_line, row.account)
+                )
+
+    def on_update(self):
+        # mappings may move accounts of any company
+        frappe.cache().delete_value(PL_CLASSIFICATION_CACHE_KEY)
+        frappe.cache().delete_value(PL_LAYOUT_CACHE_KEY)
+        clear_result_cache()
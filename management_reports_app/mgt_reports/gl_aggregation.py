@@ -0,0 +1,205 @@
+# Copyright (c) 2025, kunleadenuga and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe import _
+from frappe.query_builder.functions import Sum
+from frappe.utils import flt, get_last_day, getdate
+from pypika.enums import DatePart
+from pypika.functions import Extract
+
+from erpnext.accounts.report.financial_statements import (
+    accumulate_values_into_parents,
+    add_total_row,
+    apply_additional_conditions,
+    filter_accounts,
+    filter_out_zero_value_rows,
+    get_appropriate_currency,
+    get_data,
+)
+
+from management_reports_app.mgt_reports.account_balance import (
+    can_use_account_balances,
+    get_first_posting_date,
+    get_monthly_balances,
+)
+from management_reports_app.mgt_reports.account_tree import get_account_tree
+from management_reports_app.mgt_reports.progress import report_progress
+
+ROOT_TYPES = (("Income", "Credit"), ("Expense", "Debit"))
+
+
+def get_income_and_expense(filters, period_list):
+    """Return (income, expense) rows shaped like erpnext's financial_statements.get_data,
+    fetched with a single aggregated GL query for both root types"""
+    company_currency = get_appropriate_currency(filters.company, filters)
+    if company_currency != frappe.get_cached_value("Company", filters.company, "default_currency"):
+        # presentation currency conversion is done per GL Entry by erpnext
+        return _get_data_per_entry(filters, period_list)
+
+    accounts = get_pl_accounts(filters.company)
+    if not accounts:
+        return None, None
+
+    month_aligned = is_month_aligned(period_list)
+    balances = get_account_balances(filters, period_list, [d.name for d in accounts], month_aligned)
+
+    out = []
+    for root_type, balance_must_be in ROOT_TYPES:
+        root_accounts = [frappe._dict(d) for d in accounts if d.root_type == root_type]
+        out.append(
+            build_rows(
+                root_accounts, balances, root_type, balance_must_be, period_list, company_currency, filters
+            )
+        )
+        report_progress(_("{0} fetched").format(_(root_type)))
+
+    return tuple(out)
+
+
+def get_pl_accounts(company):
+    return [
+        d for d in get_account_tree(company).values() if d.root_type in ("Income", "Expense")
+    ]
+
+
+def is_month_aligned(period_list):
+    """Periods start on the 1st and end on a month end, so monthly buckets are exact"""
+    return all(
+        getdate(period.from_date).day == 1 and getdate(period.to_date) == get_last_day(period.to_date)
+        for period in period_list
+    )
+
+
+def get_account_balances(filters, period_list, accounts, month_aligned=True):
+    """Net (debit - credit) per account, fiscal year and month (or day when periods
+    are not month aligned). Month buckets come from MGT Monthly Account Balance when the
+    filters only use dimensions kept there, otherwise GL Entry is summed in the database"""
+    if month_aligned and can_use_account_balances(filters):
+        return get_monthly_balances(filters, period_list, accounts)
+
+    gle = frappe.qb.DocType("GL Entry")
+    query = (
+        frappe.qb.from_(gle)
+        .select(gle.account, gle.fiscal_year, (Sum(gle.debit) - Sum(gle.credit)).as_("amount"))
+        .where(gle.company == filters.company)
+        .where(gle.is_cancelled == 0)
+        .where(gle.posting_date <= period_list[-1].to_date)
+        .where(gle.account.isin(accounts))
+    )
+
+    if month_aligned:
+        posting_year = Extract(DatePart.year, gle.posting_date)
+        posting_month = Extract(DatePart.month, gle.posting_date)
+        query = query.select(
+            posting_year.as_("posting_year"), posting_month.as_("posting_month")
+        ).groupby(gle.account, gle.fiscal_year, posting_year, posting_month)
+    else:
+        query = query.select(gle.posting_date).groupby(gle.account, gle.fiscal_year, gle.posting_date)
+
+    query = apply_additional_conditions(
+        "GL Entry", query, get_first_posting_date(filters, period_list), True, frappe._dict(filters)
+    )
+
+    balances = query.run(as_dict=True)
+    if month_aligned:
+        for d in balances:
+            d.posting_date = getdate(f"{int(d.posting_year)}-{int(d.posting_month):02d}-01")
+
+    return balances
+
+
+def build_rows(accounts, balances, root_type, balance_must_be, period_list, company_currency, filters):
+    if not accounts:
+        return None
+
+    accounts, accounts_by_name, parent_children_map = filter_accounts(accounts)
+    set_period_values(accounts_by_name, balances, period_list, filters)
+    accumulate_values_into_parents(accounts, accounts_by_name, period_list)
+
+    out = prepare_rows(accounts, balance_must_be, period_list, company_currency)
+    out = filter_out_zero_value_rows(out, parent_children_map)
+
+    if out:
+        add_total_row(out, root_type, balance_must_be, period_list, company_currency)
+
+    return out
+
+
+def set_period_values(accounts_by_name, balances, period_list, filters):
+    """Spread the aggregated balances over the periods the same way erpnext's
+    calculate_values does with individual GL entries"""
+    for entry in balances:
+        d = accounts_by_name.get(entry.account)
+        if not d:
+            continue
+
+        for period in period_list:
+            if entry.posting_date <= getdate(period.to_date):
+                if filters.accumulated_values or entry.posting_date >= getdate(period.from_date):
+                    if entry.fiscal_year == period.to_date_fiscal_year:
+                        d[period.key] = d.get(period.key, 0.0) + flt(entry.amount)
+
+
+def prepare_rows(accounts, balance_must_be, period_list, company_currency):
+    data = []
+    year_start_date = period_list[0]["year_start_date"].strftime("%Y-%m-%d")
+    year_end_date = period_list[-1]["year_end_date"].strftime("%Y-%m-%d")
+
+    for d in accounts:
+        has_value = False
+        total = 0
+        row = frappe._dict(
+            {
+                "account": _(d.name),
+                "parent_account": _(d.parent_account) if d.parent_account else "",
+                "indent": flt(d.indent),
+                "year_start_date": year_start_date,
+                "year_end_date": year_end_date,
+                "currency": company_currency,
+                "include_in_gross": d.include_in_gross,
+                "account_type": d.account_type,
+                "is_group": d.is_group,
+                "opening_balance": 0.0,
+                "account_name": (
+                    f"{_(d.account_number)} - {_(d.account_name)}" if d.account_number else _(d.account_name)
+                ),
+            }
+        )
+        for period in period_list:
+            value = d.get(period.key, 0.0)
+            if balance_must_be == "Credit":
+                # change sign based on Debit or Credit, since calculation is done using (debit - credit)
+                value *= -1
+
+            row[period.key] = flt(value, 3)
+
+            if abs(row[period.key]) >= 0.005:
+                has_value = True
+                total += flt(row[period.key])
+
+        row["has_value"] = has_value
+        row["total"] = total
+        data.append(row)
+
+    return data
+
+
+def _get_data_per_entry(filters, period_list):
+    out = []
+    for root_type, balance_must_be in ROOT_TYPES:
+        out.append(
+            get_data(
+                filters.company,
+                root_type,
+                balance_must_be,
+                period_list,
+                filters=filters,
+                accumulated_values=filters.accumulated_values,
+                ignore_closing_entries=True,
+                ignore_accumulated_values_for_fy=True,
+            )
+        )
+        report_progress(_("{0} fetched").format(_(root_type)))
+
+    return tuple(out)
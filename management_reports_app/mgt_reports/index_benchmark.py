@@ -0,0 +1,213 @@
+# Copyright (c) 2025, kunleadenuga and contributors
+# For license information, please see license.txt
+
+"""Before / after timings of the report queries served by report_indexes.
+
+On a throwaway site in developer mode, load synthetic sales (Sales Invoices of
+LINES_PER_INVOICE lines of ITEM_CODES item codes spread over two years) and time the
+queries:
+
+    bench --site <site> execute management_reports_app.mgt_reports.index_benchmark.make_synthetic_sales --kwargs "{'company': '_Test Company', 'lines': 5000000}"
+    bench --site <site> execute management_reports_app.mgt_reports.index_benchmark.run --kwargs "{'company': '_Test Company', 'from_date': '2024-01-01', 'to_date': '2024-12-31', 'from_fiscal_year': '2024', 'to_fiscal_year': '2024'}"
+    bench --site <site> execute management_reports_app.mgt_reports.index_benchmark.run --kwargs "{'company': '_Test Company', 'from_date': '2024-01-15', 'to_date': '2024-12-31'}"
+    bench --site <site> execute management_reports_app.mgt_reports.index_benchmark.delete_synthetic_sales
+
+run times the queries the item reports run today, captured from
+item_sales.get_item_group_sales, item_variance.get_item_code_page (a top 20 by amount)
+and item_variance.get_budget_and_sales: each with the MGT
+indexes ignored ("before") and used ("after"), printing the median of each and the
+indexes MariaDB picked. get_item_group_sales reads the month buckets for whole months and
+the invoices otherwise, so time both a month aligned range and one that is not. The
+item code and budget queries run when fiscal years are given, the budget query on the
+Volume Budgets the site has, when the budgeting app is installed.
+"""
+
+import re
+import statistics
+import time
+
+import frappe
+from frappe import _
+from frappe.utils import add_days, cint, getdate, nowdate
+
+from management_reports_app.mgt_reports.item_sales import get_item_group_sales
+from management_reports_app.mgt_reports.item_variance import AMOUNT, get_budget_and_sales, get_item_code_page
+from management_reports_app.mgt_reports.period_plan import PeriodPlan
+from management_reports_app.mgt_reports.report_indexes import REPORT_INDEXES
+
+SYNTHETIC_PREFIX = "MGT-BENCH-"
+LINES_PER_INVOICE = 5
+ITEM_CODES = 20000
+INSERT_BATCH_SIZE = 500000
+
+# words that can follow a table name in the report queries, where no alias is given
+SQL_KEYWORDS = "(?:on|inner|left|cross|join|where|group|order|union)"
+
+
+def make_synthetic_sales(company, lines=5000000, from_date=None, days=730):
+    """Submitted Sales Invoices (every 20th cancelled) with `lines` items over `days` days,
+    inserted in batches from MariaDB's sequence engine"""
+    check_developer_mode()
+
+    lines = cint(lines)
+    days = cint(days)
+    from_date = getdate(from_date or add_days(nowdate(), -days))
+    item_groups = frappe.get_all("Item Group", filters={"is_group": 0}, pluck="name", limit=50)
+    item_groups = [frappe.db.escape(d) for d in item_groups or ["All Item Groups"]]
+    values = {"prefix": SYNTHETIC_PREFIX, "company": company, "from_date": from_date, "days": days}
+
+    invoices = -(-lines // LINES_PER_INVOICE)
+    for start in range(1, invoices + 1, INSERT_BATCH_SIZE):
+        end = min(start + INSERT_BATCH_SIZE - 1, invoices)
+        frappe.db.sql(
+            f"""
+            insert into `tabSales Invoice`
+                (name, creation, modified, modified_by, owner, docstatus, company, posting_date)
+            select
+                concat(%(prefix)s, seq), now(), now(), 'Administrator', 'Administrator',
+                if(mod(seq, 20) = 0, 2, 1), %(company)s,
+                date_add(%(from_date)s, interval mod(seq, %(days)s) day)
+            from seq_{start}_to_{end}
+        """,
+            values,
+        )
+        frappe.db.commit()
+
+    for start in range(1, lines + 1, INSERT_BATCH_SIZE):
+        end = min(start + INSERT_BATCH_SIZE - 1, lines)
+        frappe.db.sql(
+            f"""
+            insert into `tabSales Invoice Item`
+                (name, creation, modified, modified_by, owner, docstatus, parent, parenttype,
+                parentfield, idx, item_code, item_group, qty, amount)
+            select
+                concat(%(prefix)s, seq), now(), now(), 'Administrator', 'Administrator', 1,
+                concat(%(prefix)s, floor((seq - 1) / {LINES_PER_INVOICE}) + 1), 'Sales Invoice',
+                'items', mod(seq - 1, {LINES_PER_INVOICE}) + 1,
+                concat(%(prefix)s, 'ITEM-', mod(seq, {ITEM_CODES})),
+                elt(mod(seq, {len(item_groups)}) + 1, {", ".join(item_groups)}),
+                mod(seq, 10) + 1, (mod(seq, 10) + 1) * 100
+            from seq_{start}_to_{end}
+        """,
+            values,
+        )
+        frappe.db.commit()
+
+
+def delete_synthetic_sales():
+    check_developer_mode()
+
+    for doctype in ("Sales Invoice Item", "Sales Invoice"):
+        frappe.db.sql(f"delete from `tab{doctype}` where name like %s", f"{SYNTHETIC_PREFIX}%")
+        frappe.db.commit()
+
+
+def run(
+    company,
+    from_date,
+    to_date,
+    from_fiscal_year=None,
+    to_fiscal_year=None,
+    budget_against="Cost Center",
+    period="Monthly",
+    repeat=5,
+):
+    runs = {
+        "item_sales.get_item_group_sales": lambda: get_item_group_sales(company, from_date, to_date),
+    }
+    if from_fiscal_year and to_fiscal_year:
+        filters = frappe._dict(
+            company=company,
+            from_fiscal_year=from_fiscal_year,
+            to_fiscal_year=to_fiscal_year,
+            budget_against=budget_against,
+            period=period,
+        )
+        plan = PeriodPlan(filters)
+        runs["item_variance.get_item_code_page"] = lambda: get_item_code_page(filters, plan, AMOUNT, 20)
+        if frappe.db.table_exists("Volume Budget"):
+            runs["item_variance.get_budget_and_sales"] = lambda: get_budget_and_sales(filters, plan)
+
+    results = []
+    for name, fn in runs.items():
+        for query, values in capture_queries(fn):
+            before = time_query(add_index_hints(query, "ignore"), values, cint(repeat))
+            after = time_query(add_index_hints(query, "use"), values, cint(repeat))
+            results.append(
+                frappe._dict(
+                    query=name,
+                    before=before,
+                    after=after,
+                    speedup=before / after if after else None,
+                    plan=get_plan(add_index_hints(query, "use"), values),
+                )
+            )
+
+    for d in results:
+        print(f"{d.query}: {d.before:.3f}s -> {d.after:.3f}s ({d.speedup or 0:.1f}x), using {d.plan}")
+
+    return results
+
+
+def capture_queries(fn):
+    """(query, values) of every query fn runs, as it runs them"""
+    queries = []
+    sql = frappe.db.sql
+
+    def capture(query, values=(), *args, **kwargs):
+        queries.append((query, values))
+        return sql(query, values, *args, **kwargs)
+
+    frappe.db.sql = capture
+    try:
+        fn()
+    finally:
+        frappe.db.sql = sql
+
+    return queries
+
+
+def add_index_hints(query, action):
+    """query with `ignore index` / `use index` of the MGT indexes after each table (and its
+    alias) that has them"""
+    for doctype, indexes in REPORT_INDEXES.items():
+        index_names = [
+            f"`{index_name}`"
+            for index_name, _fields in indexes
+            if frappe.db.has_index(f"tab{doctype}", index_name)
+        ]
+        if not index_names:
+            continue
+
+        query = re.sub(
+            rf"(`tab{doctype}`(?:\s+(?!{SQL_KEYWORDS}\b)\w+)?)",
+            rf"\1 {action} index ({', '.join(index_names)})",
+            query,
+            flags=re.IGNORECASE,
+        )
+
+    return query
+
+
+def time_query(query, values, repeat):
+    """Median wall time of the query, after one run to warm the buffer pool"""
+    frappe.db.sql(query, values)
+
+    timings = []
+    for _i in range(max(repeat, 1)):
+        start = time.perf_counter()
+        frappe.db.sql(query, values)
+        timings.append(time.perf_counter() - start)
+
+    return statistics.median(timings)
+
+
+def get_plan(query, values):
+    return ", ".join(
+        f"{d.table}: {d.key or 'full scan'}" for d in frappe.db.sql(f"explain {query}", values, as_dict=1)
+    )
+
+
+def check_developer_mode():
+    if not frappe.conf.developer_mode:
+        frappe.throw(_("Synthetic benchmark data can only be loaded on a site in developer mode"))
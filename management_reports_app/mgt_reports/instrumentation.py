@@ -0,0 +1,104 @@
+# Copyright (c) 2025, kunleadenuga and contributors
+# For license information, please see license.txt
+
+"""Per-stage timings for report runs.
+
+Off by default. Enable it for a site with
+
+    bench --site <site> set-config mgt_reports_profiling 1
+
+and every instrumented report run writes one JSON line to logs/mgt_reports.log with
+the wall time, query count and row counts of each stage.
+"""
+
+import json
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+import frappe
+from frappe.utils import cint
+
+
+def is_profiling_enabled():
+    return cint(frappe.conf.get("mgt_reports_profiling"))
+
+
+def profile_report(report_name):
+    """Decorator for a report's execute; stages are marked inside it with record_stage"""
+
+    def decorator(execute):
+        @wraps(execute)
+        def wrapper(*args, **kwargs):
+            if not is_profiling_enabled() or getattr(frappe.local, "mgt_report_profile", None):
+                return execute(*args, **kwargs)
+
+            profile = ReportProfile(report_name)
+            frappe.local.mgt_report_profile = profile
+            try:
+                with profile.count_queries():
+                    return execute(*args, **kwargs)
+            finally:
+                frappe.local.mgt_report_profile = None
+                profile.log()
+
+        return wrapper
+
+    return decorator
+
+
+def record_stage(stage, **rows):
+    """Close a stage: time and queries since the previous stage, plus row counts"""
+    profile = getattr(frappe.local, "mgt_report_profile", None)
+    if profile:
+        profile.record(stage, rows)
+
+
+class ReportProfile:
+    def __init__(self, report_name):
+        self.report_name = report_name
+        self.stages = []
+        self.queries = 0
+        self.started = self.last_mark = time.perf_counter()
+        self.last_queries = 0
+
+    def record(self, stage, rows):
+        now = time.perf_counter()
+        self.stages.append(
+            {
+                "stage": stage,
+                "ms": round((now - self.last_mark) * 1000, 2),
+                "queries": self.queries - self.last_queries,
+                "rows": rows,
+            }
+        )
+        self.last_mark, self.last_queries = now, self.queries
+
+    @contextmanager
+    def count_queries(self):
+        sql = frappe.db.sql
+
+        def counted_sql(*args, **kwargs):
+            self.queries += 1
+            return sql(*args, **kwargs)
+
+        frappe.db.sql = counted_sql
+        try:
+            yield
+        finally:
+            # drop the instance attribute so the class method is used again
+            del frappe.db.sql
+
+    def log(self):
+        frappe.logger("mgt_reports", allow_site=True).info(
+            json.dumps(
+                {
+                    "report": self.report_name,
+                    "user": frappe.session.user,
+                    "total_ms": round((time.perf_counter() - self.started) * 1000, 2),
+                    "queries": self.queries,
+                    "stages": self.stages,
+                },
+                default=str,
+            )
+        )
@@ -0,0 +1,74 @@
+# Copyright (c) 2025, kunleadenuga and contributors
+# For license information, please see license.txt
+
+import frappe
+
+ITEM_GROUP_TREE_CACHE_KEY = "mgt_reports_item_group_tree"
+
+
+def get_item_group_tree():
+    """Item Group index of the site keyed by name, cached in redis.
+
+    Each entry carries parent_item_group, is_group, lft, rgt and depth (0 for the root,
+    1 for the groups directly below it, ..)."""
+    tree = frappe.cache().get_value(ITEM_GROUP_TREE_CACHE_KEY)
+    if tree is None:
+        tree = build_item_group_tree()
+        frappe.cache().set_value(ITEM_GROUP_TREE_CACHE_KEY, tree)
+
+    return tree
+
+
+def build_item_group_tree():
+    item_groups = frappe.db.sql(
+        """
+        select name, parent_item_group, is_group, lft, rgt
+        from `tabItem Group`
+        order by lft
+    """,
+        as_dict=1,
+    )
+
+    tree = {}
+    # ordered by lft, so a parent is always indexed before its children
+    for d in item_groups:
+        parent = tree.get(d.parent_item_group)
+        d.depth = parent.depth + 1 if parent else 0
+        tree[d.name] = d
+
+    return tree
+
+
+def get_rollup_groups(level):
+    """Item groups a report rolled up to `level` shows: those at that depth, and the
+    shallower ones for what is posted above it"""
+    return [d.name for d in get_item_group_tree().values() if d.depth <= level]
+
+
+def get_rollup_sql(column, level):
+    """(expression, join) grouping the item groups of `column` by their ancestor at
+    `level` (or themselves when shallower), found in the database with the nested set:
+    the deepest of the rollup groups whose lft/rgt range holds the item group. Without a
+    level the expression is the column itself"""
+    if not level:
+        return column, ""
+
+    rollup_groups = ", ".join(frappe.db.escape(name) for name in get_rollup_groups(level))
+    join = f"""
+        left join (
+            select
+                ig.name as item_group,
+                (
+                    select anc.name from `tabItem Group` anc
+                    where anc.lft <= ig.lft and anc.rgt >= ig.rgt and anc.name in ({rollup_groups})
+                    order by anc.lft desc
+                    limit 1
+                ) as rollup_group
+            from `tabItem Group` ig
+        ) item_group_rollup on item_group_rollup.item_group = {column}"""
+
+    return f"ifnull(item_group_rollup.rollup_group, {column})", join
+
+
+def clear_item_group_tree_cache(doc, method=None, *args):
+    frappe.cache().delete_value(ITEM_GROUP_TREE_CACHE_KEY)
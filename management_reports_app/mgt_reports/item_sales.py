@@ -0,0 +1,147 @@
+# Copyright (c) 2025, kunleadenuga and contributors
+# For license information, please see license.txt
+
+import calendar
+
+import frappe
+from frappe.utils import flt, get_last_day, getdate, now
+
+from management_reports_app.mgt_reports.account_balance import get_bucket_name
+from management_reports_app.mgt_reports.item_group_tree import get_rollup_sql
+
+
+def on_sales_invoice_submit(doc, method=None):
+    update_item_group_sales(doc, 1)
+
+
+def on_sales_invoice_cancel(doc, method=None):
+    update_item_group_sales(doc, -1)
+
+
+def update_item_group_sales(doc, sign):
+    posting_date = getdate(doc.posting_date)
+    totals = {}
+    for item in doc.items:
+        qty, amount = totals.get(item.item_group, (0, 0))
+        totals[item.item_group] = (qty + flt(item.qty), amount + flt(item.amount))
+
+    timestamp = now()
+    for item_group, (qty, amount) in totals.items():
+        key = (doc.company, item_group or "", posting_date.year, posting_date.month)
+        frappe.db.sql(
+            """
+            insert into `tabMGT Item Group Monthly Sales`
+                (name, creation, modified, modified_by, owner, docstatus, company, item_group,
+                posting_year, posting_month, qty, amount)
+            values
+                (%s, %s, %s, 'Administrator', 'Administrator', 0, %s, %s, %s, %s, %s, %s)
+            on duplicate key update
+                qty = qty + values(qty),
+                amount = amount + values(amount),
+                modified = values(modified)
+        """,
+            (get_bucket_name(key), timestamp, timestamp, *key, sign * qty, sign * amount),
+        )
+
+
+def rebuild_item_group_sales(company=None):
+    """Recompute the month buckets from submitted Sales Invoice Items"""
+    conditions = ""
+    if company:
+        conditions = " and {0}company = %(company)s"
+
+    frappe.db.sql(
+        f"""
+        delete from `tabMGT Item Group Monthly Sales`
+        where 1=1 {conditions.format("")}
+    """,
+        {"company": company},
+    )
+
+    frappe.db.sql(
+        f"""
+        insert into `tabMGT Item Group Monthly Sales`
+            (name, creation, modified, modified_by, owner, docstatus, company, item_group,
+            posting_year, posting_month, qty, amount)
+        select
+            sha1(concat_ws('|', s.company, ifnull(si.item_group, ''), year(s.posting_date),
+                month(s.posting_date))),
+            now(), now(), 'Administrator', 'Administrator', 0,
+            s.company, ifnull(si.item_group, ''), year(s.posting_date), month(s.posting_date),
+            sum(si.qty), sum(si.amount)
+        from
+            `tabSales Invoice Item` si
+            inner join `tabSales Invoice` s on s.name = si.parent
+        where
+            s.docstatus = 1
+            {conditions.format("s.")}
+        group by
+            s.company, ifnull(si.item_group, ''), year(s.posting_date), month(s.posting_date)
+    """,
+        {"company": company},
+    )
+
+
+def get_item_group_sales(company, from_date, to_date, rollup_level=0):
+    """Qty and amount per item group and month between two dates, as
+    frappe._dicts with item_group, qty, amount, month_name and year. With a rollup_level
+    the item groups are those at that depth of the tree (see item_group_tree)"""
+    from_date, to_date = getdate(from_date), getdate(to_date)
+    if from_date.day != 1 or to_date != get_last_day(to_date):
+        return get_item_group_sales_from_invoices(company, from_date, to_date, rollup_level)
+
+    item_group, rollup_join = get_rollup_sql("b.item_group", rollup_level)
+    data = frappe.db.sql(
+        f"""
+        select
+            {item_group} as item_group,
+            sum(b.qty) as qty,
+            sum(b.amount) as amount,
+            b.posting_month,
+            b.posting_year as year
+        from `tabMGT Item Group Monthly Sales` b {rollup_join}
+        where
+            b.company = %(company)s
+            and b.posting_year * 100 + b.posting_month between %(from_period)s and %(to_period)s
+        group by {item_group}, b.posting_year, b.posting_month
+    """,
+        {
+            "company": company,
+            "from_period": from_date.year * 100 + from_date.month,
+            "to_period": to_date.year * 100 + to_date.month,
+        },
+        as_dict=1,
+    )
+
+    for d in data:
+        d.item_group = d.item_group or None
+        d.month_name = calendar.month_name[int(d.posting_month)]
+
+    return data
+
+
+def get_item_group_sales_from_invoices(company, from_date, to_date, rollup_level=0):
+    item_group, rollup_join = get_rollup_sql("si.item_group", rollup_level)
+    return frappe.db.sql(
+        f"""
+        SELECT
+            {item_group} as item_group,
+            SUM(si.qty) as qty,
+            SUM(si.amount) as amount,
+            MONTHNAME(s.posting_date) as month_name,
+            YEAR(s.posting_date) as year
+        FROM
+            `tabSales Invoice Item` si
+            INNER JOIN `tabSales Invoice` s ON s.name = si.parent {rollup_join}
+        WHERE
+            s.docstatus = 1
+            AND s.posting_date between %s and %s
+            AND s.company = %s
+        GROUP BY
+            {item_group},
+            YEAR(s.posting_date),
+            MONTH(s.posting_date)
+    """,
+        (from_date, to_date, company),
+        as_dict=1,
+    )
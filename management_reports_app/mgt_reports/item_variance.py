@@ -0,0 +1,536 @@
+# Copyright (c) 2025, kunleadenuga and contributors
+# For license information, please see license.txt
+
+"""Budget vs actual per item group, by value and by quantity.
+
+Item Budget Variance Report (amounts) and Item Qty Budget Based Report (quantities) are
+views on the same figures: get_item_variance reads the Volume Budgets, phased by month in
+the database, and the item group sales in one query for both measures and caches the
+result per company and filters, so opening the second report for the same filters does
+not query again. The cache of a company is dropped when a Sales Invoice or Volume Budget
+of it is submitted or cancelled, and that of every company when a Monthly Distribution
+or Item Group changes.
+
+With group_by set to ITEM_CODE the reports show the sales of item codes instead. Volume
+Budgets are set per item group, so those rows have no budget. There can be hundreds of
+thousands of item codes over a few years, so they are ranked and cut to the rows shown
+in the database (get_item_code_page): the reports need a top N, and every item code is
+read a page at a time through report_rows.
+"""
+
+import calendar
+import heapq
+
+import frappe
+from frappe import _
+from frappe.utils import cint, flt, get_last_day, getdate
+
+from management_reports_app.mgt_reports.instrumentation import record_stage
+from management_reports_app.mgt_reports.item_group_tree import get_rollup_sql
+from management_reports_app.mgt_reports.period_plan import DEFAULT_MONTH_SHARE, PeriodPlan
+
+ITEM_VARIANCE_CACHE_KEY = "mgt_reports_item_variance"
+
+AMOUNT, QTY = "amount", "qty"
+
+# source of a row of get_budget_and_sales
+BUDGET, ACTUAL = "budget", "actual"
+
+# values of the group_by filter
+ITEM_GROUP, ITEM_CODE = "Item Group", "Item Code"
+
+# key of the row summing up the item groups or codes beyond the top N, labelled when the
+# rows are built; not a string, so it cannot be taken for an item group named Others
+OTHERS = ("others",)
+
+# filters the figures depend on, besides the company
+VARIANCE_FILTERS = (
+    "from_fiscal_year",
+    "to_fiscal_year",
+    "period",
+    "budget_against",
+    "rollup_level",
+    "group_by",
+)
+
+
+def execute_item_variance(filters, measure):
+    """Columns, rows and chart of an item variance report for AMOUNT or QTY"""
+    filters = frappe._dict(filters or {})
+    if filters.group_by == ITEM_CODE and cint(filters.top_n) <= 0:
+        frappe.throw(_("Set Top N to show item codes, there are too many to show them all"))
+
+    plan = PeriodPlan(filters)
+    columns = get_columns(plan, filters.group_by)
+    record_stage("columns", columns=len(columns))
+
+    variance = get_item_variance(filters, plan)
+    if filters.group_by != ITEM_CODE:
+        variance = get_top_item_groups(variance, cint(filters.top_n))
+    data = get_variance_rows(variance, measure, plan)
+    record_stage("rows", rows=len(data))
+
+    chart = get_chart_data(plan, data)
+    record_stage("chart")
+
+    return columns, data, None, chart
+
+
+def get_item_variance_rows(filters, measure):
+    """Columns, every row (no top N), the sort_values of the rows (its total actual)
+    and the totals row of an item variance report by item group, see report_rows"""
+    filters = frappe._dict(filters)
+    plan = PeriodPlan(filters)
+    variance = get_item_variance(filters, plan)
+
+    totals = None
+    if variance:
+        summed = {
+            key: [sum(values) for values in zip(*(group[key] for group in variance.values()))]
+            for key in next(iter(variance.values()))
+        }
+        totals = get_variance_rows({_("Total"): summed}, measure, plan)[0]
+
+    return frappe._dict(
+        columns=get_columns(plan, filters.group_by),
+        rows=get_variance_rows(variance, measure, plan),
+        sort_values=[sum(group[measure]) for group in variance.values()],
+        totals=totals,
+    )
+
+
+def get_item_variance(filters, plan):
+    """{item group: {"budget_amount", "budget_qty", "amount", "qty": value per period}},
+    item groups with a budget first; by ITEM_CODE, the top N item codes and Others (see
+    build_item_code_variance)"""
+    cache_key = get_cache_key(filters.company)
+    field = "|".join(str(filters.get(fieldname)) for fieldname in VARIANCE_FILTERS)
+    if filters.group_by == ITEM_CODE:
+        # only the top N is kept, not every item code
+        field += f"|{cint(filters.top_n)}"
+
+    variance = frappe.cache().hget(cache_key, field)
+    if variance is None:
+        if filters.group_by == ITEM_CODE:
+            variance = build_item_code_variance(filters, plan)
+        else:
+            variance = build_item_variance(filters, plan)
+        frappe.cache().hset(cache_key, field, variance)
+
+    return variance
+
+
+def build_item_variance(filters, plan):
+    data = get_budget_and_sales(filters, plan)
+    record_stage("budget_and_actuals", rows=len(data))
+
+    variance = {}
+    for d in data:
+        if d.item_group not in variance:
+            variance[d.item_group] = {
+                key: [0.0] * len(plan.periods) for key in ("budget_amount", "budget_qty", AMOUNT, QTY)
+            }
+
+        idx = plan.month_periods.get((int(d.year), calendar.month_name[int(d.month)]))
+        if idx is None:
+            continue
+
+        group = variance[d.item_group]
+        if d.source == BUDGET:
+            group["budget_amount"][idx] += flt(d.amount)
+            group["budget_qty"][idx] += flt(d.qty)
+        else:
+            group[AMOUNT][idx] += flt(d.amount)
+            group[QTY][idx] += flt(d.qty)
+
+    return variance
+
+
+def build_item_code_variance(filters, plan):
+    """The top_n item codes by amount and the rest summed up as Others"""
+    if not plan.fiscal_years:
+        return {}
+
+    # one more than the top N, to tell whether there are Others
+    top_n = cint(filters.top_n)
+    page = get_item_code_page(filters, plan, AMOUNT, top_n + 1)
+    variance = {item_code: page.variance[item_code] for _total, item_code in page.ranked[:top_n]}
+    if len(page.ranked) > top_n:
+        totals = get_item_code_totals(filters, plan)
+        others = new_item_code_variance(plan)
+        for key in (AMOUNT, QTY):
+            others[key] = [
+                total - sum(group[key][idx] for group in variance.values())
+                for idx, total in enumerate(totals[key])
+            ]
+        variance[OTHERS] = others
+
+    record_stage("item_code_sales", items=len(variance))
+    return variance
+
+
+# sales the item code figures come from, for the company, from_date and to_date
+ITEM_CODE_SALES_CONDITIONS = """
+        s.docstatus = 1
+        and s.posting_date between %(from_date)s and %(to_date)s
+        and s.company = %(company)s"""
+
+ITEM_CODE_SALES = f"""
+    from
+        `tabSales Invoice Item` si
+        inner join `tabSales Invoice` s on s.name = si.parent
+    where {ITEM_CODE_SALES_CONDITIONS}"""
+
+ITEM_CODE_MONTH = "year(s.posting_date) * 12 + month(s.posting_date) - 1"
+
+
+def get_item_code_page(filters, plan, order_by, limit, start=0, after=None):
+    """Up to limit item codes by their total AMOUNT or QTY (order_by) descending, then
+    item code, from position start or after the (total, item code) key `after`, ranked
+    and cut in the database: frappe._dict(ranked=[(total, item code)], variance) for them
+    only, so what is held is bounded by limit whatever the number of item codes.
+
+    The total of a key is the decimal sum as a string, compared as a decimal again, so
+    that paging on it neither skips nor repeats item codes of (nearly) equal totals"""
+    values = get_item_code_values(filters, plan)
+    values.update(limit=cint(limit), start=cint(start))
+
+    having = ""
+    if after:
+        values.update(after_total=str(after[0]), after_item_code=after[1] or "", start=0)
+        having = """having total < cast(%(after_total)s as decimal(65, 9))
+                or (total = cast(%(after_total)s as decimal(65, 9)) and item_code > %(after_item_code)s)"""
+
+    # the page is ranked in a derived table and only its item codes are read by month
+    ranked, variance = [], {}
+    month_periods = get_item_code_month_periods(plan)
+    for item_code, total, month, amount, qty in frappe.db.sql(
+        f"""
+        select r.item_code, r.total, {ITEM_CODE_MONTH}, sum(si.amount), sum(si.qty)
+        from
+            (
+                select ifnull(si.item_code, '') as item_code, sum(si.{order_by}) as total
+                {ITEM_CODE_SALES}
+                group by ifnull(si.item_code, '')
+                {having}
+                order by total desc, item_code
+                limit %(limit)s offset %(start)s
+            ) r
+            inner join `tabSales Invoice Item` si on ifnull(si.item_code, '') = r.item_code
+            inner join `tabSales Invoice` s on s.name = si.parent
+        where {ITEM_CODE_SALES_CONDITIONS}
+        group by r.item_code, r.total, {ITEM_CODE_MONTH}
+        order by r.total desc, r.item_code
+    """,
+        values,
+    ):
+        if item_code not in variance:
+            ranked.append((str(total), item_code))
+            variance[item_code] = new_item_code_variance(plan)
+
+        idx = month_periods.get(int(month))
+        if idx is not None:
+            variance[item_code][AMOUNT][idx] += flt(amount)
+            variance[item_code][QTY][idx] += flt(qty)
+
+    return frappe._dict(ranked=ranked, variance=variance)
+
+
+def get_item_code_totals(filters, plan, count=False):
+    """frappe._dict(amount, qty) of the sales of all item codes per period, with the number
+    of item codes as count if asked for"""
+    values = get_item_code_values(filters, plan)
+    totals = frappe._dict(new_item_code_variance(plan))
+    if count:
+        totals.count = frappe.db.sql(
+            f"select count(distinct ifnull(si.item_code, '')) {ITEM_CODE_SALES}", values
+        )[0][0]
+
+    month_periods = get_item_code_month_periods(plan)
+    for month, amount, qty in frappe.db.sql(
+        f"""
+        select {ITEM_CODE_MONTH}, sum(si.amount), sum(si.qty)
+        {ITEM_CODE_SALES}
+        group by {ITEM_CODE_MONTH}
+    """,
+        values,
+    ):
+        idx = month_periods.get(int(month))
+        if idx is not None:
+            totals[AMOUNT][idx] += flt(amount)
+            totals[QTY][idx] += flt(qty)
+
+    return totals
+
+
+def get_item_code_values(filters, plan):
+    return {"company": filters.company, "from_date": plan.from_date, "to_date": plan.to_date}
+
+
+def get_item_code_month_periods(plan):
+    """year * 12 + month - 1 -> index of the period covering the month"""
+    return {
+        year * 12 + list(calendar.month_name).index(month_name) - 1: idx
+        for (year, month_name), idx in plan.month_periods.items()
+    }
+
+
+def new_item_code_variance(plan):
+    # item codes have no budget of their own
+    return {key: [0.0] * len(plan.periods) for key in ("budget_amount", "budget_qty", AMOUNT, QTY)}
+
+
+def get_budget_and_sales(filters, plan):
+    """Volume Budget amount and qty phased by Monthly Distribution, and sales, per item
+    group and calendar month in one result set: frappe._dicts with source (BUDGET or
+    ACTUAL), item_group, year, month (1-12), amount and qty, budgets first.
+
+    A month missing from a budget's distribution gets DEFAULT_MONTH_SHARE of it; yearly
+    reports take the whole budget (100 / 12 a month) whatever the distribution. Sales come
+    from the month buckets (see item_sales) unless the fiscal years do not start on the 1st.
+    With a rollup_level filter both are grouped by the item groups at that depth of the
+    tree (see item_group_tree)"""
+    if not plan.fiscal_years:
+        return []
+
+    values = {
+        "company": filters.company,
+        "from_fiscal_year": filters.from_fiscal_year,
+        "to_fiscal_year": filters.to_fiscal_year,
+        "budget_against": filters.budget_against,
+        "yearly": cint(plan.is_yearly),
+        "default_share": DEFAULT_MONTH_SHARE,
+        "from_date": getdate(plan.from_date),
+        "to_date": getdate(plan.to_date),
+    }
+    rollup_level = cint(filters.rollup_level)
+    budget_item_group, budget_rollup_join = get_rollup_sql("bi.item_group", rollup_level)
+    months = "\n            union all ".join(
+        f"select {month} as month, {frappe.db.escape(calendar.month_name[month])} as month_name"
+        for month in range(1, 13)
+    )
+
+    if values["from_date"].day == 1 and values["to_date"] == get_last_day(values["to_date"]):
+        values["from_period"] = values["from_date"].year * 100 + values["from_date"].month
+        values["to_period"] = values["to_date"].year * 100 + values["to_date"].month
+        item_group, rollup_join = get_rollup_sql("b.item_group", rollup_level)
+        sales_query = f"""
+        select
+            '{ACTUAL}', nullif({item_group}, ''), b.posting_year, b.posting_month,
+            sum(b.amount), sum(b.qty)
+        from `tabMGT Item Group Monthly Sales` b {rollup_join}
+        where
+            b.company = %(company)s
+            and b.posting_year * 100 + b.posting_month between %(from_period)s and %(to_period)s
+        group by {item_group}, b.posting_year, b.posting_month"""
+    else:
+        item_group, rollup_join = get_rollup_sql("si.item_group", rollup_level)
+        sales_query = f"""
+        select
+            '{ACTUAL}', {item_group}, year(s.posting_date), month(s.posting_date),
+            sum(si.amount), sum(si.qty)
+        from
+            `tabSales Invoice Item` si
+            inner join `tabSales Invoice` s on s.name = si.parent {rollup_join}
+        where
+            s.docstatus = 1
+            and s.posting_date between %(from_date)s and %(to_date)s
+            and s.company = %(company)s
+        group by {item_group}, year(s.posting_date), month(s.posting_date)"""
+
+    share = "(case when %(yearly)s then 100e0 / 12 else ifnull(mdp.percentage_allocation, %(default_share)s) end)"
+
+    return frappe.db.sql(
+        f"""
+        select
+            '{BUDGET}' as source,
+            {budget_item_group} as item_group,
+            year(fy.year_start_date) + (m.month < month(fy.year_start_date)) as year,
+            m.month,
+            sum(bi.budget_amount * {share} / 100) as amount,
+            sum(bi.budget_qty * {share} / 100) as qty
+        from
+            `tabVolume Budget` vb
+            inner join `tabBudget Item` bi on bi.parent = vb.name
+            inner join `tabFiscal Year` fy on fy.name = vb.fiscal_year
+            cross join (
+            {months}
+            ) m
+            left join `tabMonthly Distribution Percentage` mdp
+                on mdp.parent = vb.monthly_distribution
+                and mdp.parenttype = 'Monthly Distribution'
+                and mdp.month = m.month_name {budget_rollup_join}
+        where
+            vb.docstatus = 1
+            and vb.fiscal_year between %(from_fiscal_year)s and %(to_fiscal_year)s
+            and vb.company = %(company)s
+            and vb.budget_against = %(budget_against)s
+        group by {budget_item_group}, fy.year_start_date, m.month
+        union all
+        {sales_query}
+        order by source desc
+    """,
+        values,
+        as_dict=1,
+    )
+
+
+def get_top_item_groups(variance, top_n=None):
+    """The top_n item groups by value (the larger of their budget and actual amount),
+    picked with a bounded heap and in descending order, and the rest summed up as Others;
+    variance unchanged without top_n"""
+    if not top_n or len(variance) <= top_n:
+        return variance
+
+    def get_value(item_group):
+        values = variance[item_group]
+        return max(sum(values["budget_amount"]), sum(values[AMOUNT]))
+
+    top = heapq.nlargest(top_n, variance, key=get_value)
+    out = {item_group: variance[item_group] for item_group in top}
+
+    others = {key: [0.0] * len(values) for key, values in variance[top[0]].items()}
+    for item_group, group in variance.items():
+        if item_group in out:
+            continue
+
+        for key, values in group.items():
+            others[key] = [total + value for total, value in zip(others[key], values)]
+
+    out[OTHERS] = others
+    return out
+
+
+def get_variance_rows(variance, measure, plan):
+    """Report rows: item group, then budget, actual and % achieved per period and, unless
+    yearly, in total"""
+    data = []
+    for item_group, values in variance.items():
+        budgets, actuals = values["budget_" + measure], values[measure]
+
+        row = [get_row_label(item_group)]
+        for budget, actual in zip(budgets, actuals):
+            row.extend([budget, actual, get_achievement(actual, budget)])
+
+        if not plan.is_yearly:
+            total_budget, total_actual = sum(budgets), sum(actuals)
+            row.extend([total_budget, total_actual, get_achievement(total_actual, total_budget)])
+
+        data.append(row)
+
+    return data
+
+
+def get_row_label(item_group):
+    return _("Others") if item_group == OTHERS else item_group
+
+
+def get_achievement(actual, budget):
+    return (actual / budget * 100) if budget else 0
+
+
+def get_columns(plan, group_by=None):
+    if group_by == ITEM_CODE:
+        columns = [
+            {"label": _("Item Code"), "fieldname": "item_code", "fieldtype": "Link", "options": "Item", "width": 150}
+        ]
+    else:
+        columns = [
+            {
+                "label": _("Item Group"),
+                "fieldname": "item_group",
+                "fieldtype": "Link",
+                "options": "Item Group",
+                "width": 150,
+            }
+        ]
+
+    for period in plan.periods:
+        if plan.is_yearly:
+            # For Yearly, add simple year-based columns
+            label, fieldname = str(period.fiscal_year), str(period.fiscal_year)
+        else:
+            # For Monthly/Quarterly/Half-Yearly
+            label = "(" + period.label + ") " + str(period.fiscal_year)
+            fieldname = f"{period.label}_{period.fiscal_year}".lower().replace("-", "_")
+
+        columns.extend(
+            [
+                {
+                    "label": _("Budget") + " " + label,
+                    "fieldtype": "Float",
+                    "fieldname": f"budget_{fieldname}",
+                    "width": 150,
+                },
+                {
+                    "label": _("Actual") + " " + label,
+                    "fieldtype": "Float",
+                    "fieldname": f"actual_{fieldname}",
+                    "width": 150,
+                },
+                {
+                    "label": _("% Ach") + " " + label,
+                    "fieldtype": "Percent",
+                    "fieldname": f"achievement_{fieldname}",
+                    "width": 150,
+                },
+            ]
+        )
+
+    # Add total columns if not yearly
+    if not plan.is_yearly:
+        columns.extend(
+            [
+                {"label": _("Total Budget"), "fieldtype": "Float", "fieldname": "total_budget", "width": 150},
+                {"label": _("Total Actual"), "fieldtype": "Float", "fieldname": "total_actual", "width": 150},
+                {
+                    "label": _("Total % Ach"),
+                    "fieldtype": "Percent",
+                    "fieldname": "total_achievement",
+                    "width": 150,
+                },
+            ]
+        )
+
+    return columns
+
+
+def get_chart_data(plan, data):
+    if not data:
+        return None
+
+    labels = [period.label for period in plan.periods]
+
+    no_of_columns = len(labels)
+    budget_values = []
+    actual_values = []
+
+    for row in data:
+        values = row[1:]  # Skip first column (Item Group)
+        for i in range(0, len(values), 2):
+            if i // 2 < no_of_columns:  # Only take values for the current period
+                budget_values.append(values[i])
+                actual_values.append(values[i + 1])
+
+    return {
+        "data": {
+            "labels": labels,
+            "datasets": [
+                {"name": _("Budget"), "values": budget_values, "chartType": "bar"},
+                {"name": _("Actual Sales"), "values": actual_values, "chartType": "bar"},
+            ],
+        },
+        "type": "bar",
+    }
+
+
+def get_cache_key(company):
+    return f"{ITEM_VARIANCE_CACHE_KEY}|{company}"
+
+
+def clear_item_variance_cache(doc, method=None, *args):
+    if doc.get("company"):
+        frappe.cache().delete_value(get_cache_key(doc.company))
+    else:
+        # an Item Group change moves the rolled up figures of every company
+        frappe.cache().delete_keys(ITEM_VARIANCE_CACHE_KEY)
@@ -0,0 +1,88 @@
+# Copyright (c) 2025, kunleadenuga and contributors
+# For license information, please see license.txt
+
+"""Report periods of the item group reports.
+
+A PeriodPlan is built once per report run from the filters: the fiscal years in range and
+the periods of each (dates, labels and the calendar months they cover). get_columns, the
+row builders and get_chart_data read it instead of querying Fiscal Year for each row.
+"""
+
+import calendar
+
+import frappe
+from frappe.utils import add_days, add_months, formatdate, getdate
+
+PERIOD_MONTHS = {"Monthly": 1, "Quarterly": 3, "Half-Yearly": 6, "Yearly": 12}
+
+# percentage of a month the reports give a budget without a Monthly Distribution
+DEFAULT_MONTH_SHARE = 8.33
+
+
+class PeriodPlan:
+    def __init__(self, filters):
+        self.period = filters["period"]
+        self.fiscal_years = get_fiscal_years(filters["from_fiscal_year"], filters["to_fiscal_year"])
+        self.periods = []
+        # (year, month name) -> index of the period covering the month
+        self.month_periods = {}
+        for fiscal_year in self.fiscal_years:
+            fiscal_year.periods = get_fiscal_year_periods(fiscal_year, self.period)
+            for period in fiscal_year.periods:
+                period.idx = len(self.periods)
+                self.month_periods.update(dict.fromkeys(period.months, period.idx))
+                self.periods.append(period)
+
+        self.from_date = self.fiscal_years[0].year_start_date if self.fiscal_years else None
+        self.to_date = self.fiscal_years[-1].year_end_date if self.fiscal_years else None
+
+    @property
+    def is_yearly(self):
+        return self.period == "Yearly"
+
+
+def get_fiscal_years(from_fiscal_year, to_fiscal_year):
+    return frappe.db.sql(
+        """
+        select name, year_start_date, year_end_date
+        from `tabFiscal Year`
+        where name between %(from_fiscal_year)s and %(to_fiscal_year)s
+        order by year_start_date
+    """,
+        {"from_fiscal_year": from_fiscal_year, "to_fiscal_year": to_fiscal_year},
+        as_dict=1,
+    )
+
+
+def get_fiscal_year_periods(fiscal_year, period):
+    """Periods of a fiscal year, as erpnext.controllers.trends.get_period_date_ranges
+    splits it, with the (year, month name) of each month they cover"""
+    periods = []
+    from_date, year_end_date = getdate(fiscal_year.year_start_date), getdate(fiscal_year.year_end_date)
+    while from_date <= year_end_date:
+        to_date = min(getdate(add_days(add_months(from_date, PERIOD_MONTHS[period]), -1)), year_end_date)
+
+        months, month_start = [], from_date.replace(day=1)
+        while month_start <= to_date:
+            months.append((month_start.year, calendar.month_name[month_start.month]))
+            month_start = getdate(add_months(month_start, 1))
+
+        if period == "Yearly":
+            label = str(fiscal_year.name)
+        elif period == "Monthly":
+            label = formatdate(from_date, format_string="MMM")
+        else:
+            label = formatdate(from_date, format_string="MMM") + "-" + formatdate(to_date, format_string="MMM")
+
+        periods.append(
+            frappe._dict(
+                fiscal_year=fiscal_year.name,
+                from_date=from_date,
+                to_date=to_date,
+                label=label,
+                months=months,
+            )
+        )
+        from_date = getdate(add_days(to_date, 1))
+
+    return periods
@@ -0,0 +1,147 @@
+# Copyright (c) 2025, kunleadenuga and contributors
+# For license information, please see license.txt
+
+"""Account to management P&L line index.
+
+The roots and top level groups of a company's P&L are each assigned one P&L line. The
+lines of the MGT Report Settings mapping table win; accounts without a mapping fall back
+to the naming rules of default_pl_line. The index is built once per company, cached in
+redis and cleared when an Account or the settings change.
+"""
+
+import frappe
+
+from management_reports_app.mgt_reports.account_tree import get_account_tree
+
+PL_CLASSIFICATION_CACHE_KEY = "mgt_reports_pl_classification"
+SETTINGS_DOCTYPE = "MGT Report Settings"
+
+# P&L lines of root accounts
+INCOME = "Income"
+COST_OF_SALES = "Cost of Sales"
+OPERATING_EXPENSES = "Operating Expenses"
+OTHER_EXPENSES = "Other Expenses"
+
+# P&L lines of the groups directly below a root
+REVENUE = "Revenue"
+OTHER_INCOME = "Other Income"
+DEPRECIATION = "Depreciation & Amortisation"
+FINANCE_COST = "Finance Cost"
+EMPLOYEE_BENEFITS = "Employee Benefits"
+ADMINISTRATIVE_EXPENSES = "Administrative Expenses"
+SELLING_EXPENSES = "Selling & Marketing"
+OPERATING_EXPENSE = "Operating Expense"
+
+EXPENSE_ROOTS = (COST_OF_SALES, OPERATING_EXPENSES, OTHER_EXPENSES)
+
+# the groups below Operating Expenses other than depreciation and finance charges
+OPERATING_EXPENSE_LINES = (EMPLOYEE_BENEFITS, ADMINISTRATIVE_EXPENSES, SELLING_EXPENSES, OPERATING_EXPENSE)
+
+# P&L line -> (root type, whether it is a line of root accounts)
+PL_LINES = {
+    INCOME: ("Income", True),
+    COST_OF_SALES: ("Expense", True),
+    OPERATING_EXPENSES: ("Expense", True),
+    OTHER_EXPENSES: ("Expense", True),
+    REVENUE: ("Income", False),
+    OTHER_INCOME: ("Income", False),
+    DEPRECIATION: ("Expense", False),
+    FINANCE_COST: ("Expense", False),
+    EMPLOYEE_BENEFITS: ("Expense", False),
+    ADMINISTRATIVE_EXPENSES: ("Expense", False),
+    SELLING_EXPENSES: ("Expense", False),
+    OPERATING_EXPENSE: ("Expense", False),
+}
+
+
+def get_pl_classification(company):
+    """{account: P&L line} of a company's P&L roots and top level groups, in tree order"""
+    classification = frappe.cache().hget(PL_CLASSIFICATION_CACHE_KEY, company)
+    if classification is None:
+        classification = build_pl_classification(company)
+        frappe.cache().hset(PL_CLASSIFICATION_CACHE_KEY, company, classification)
+
+    return classification
+
+
+def get_pl_line(company, account):
+    return get_pl_classification(company).get(account)
+
+
+def get_pl_line_accounts(company):
+    """{P&L line: accounts}, accounts in tree order"""
+    line_accounts = {}
+    for account, pl_line in get_pl_classification(company).items():
+        line_accounts.setdefault(pl_line, []).append(account)
+
+    return line_accounts
+
+
+def build_pl_classification(company):
+    tree = get_account_tree(company)
+    mapped = get_mapped_pl_lines(tree)
+
+    classification = {}
+    # roots first: the default line of a top level group depends on its root's line
+    for d in sorted(tree.values(), key=lambda d: (d.top_group is not None, d.lft)):
+        if is_pl_line_account(d):
+            pl_line = mapped.get(d.name) or default_pl_line(d, classification.get(d.root_account))
+            if pl_line:
+                classification[d.name] = pl_line
+
+    return dict(sorted(classification.items(), key=lambda item: tree[item[0]].lft))
+
+
+def get_mapped_pl_lines(tree):
+    """P&L lines set in MGT Report Settings for the accounts of the tree"""
+    mappings = frappe.get_all(
+        "MGT PL Line Mapping",
+        filters={"parenttype": SETTINGS_DOCTYPE, "parentfield": "pl_line_mappings"},
+        fields=["account", "pl_line"],
+    )
+    return {d.account: d.pl_line for d in mappings if d.account in tree}
+
+
+def is_pl_line_account(d):
+    """Only roots and the groups directly below them carry a P&L line"""
+    return d.report_type == "Profit and Loss" and d.top_group in (None, d.name)
+
+
+def default_pl_line(d, root_line):
+    """P&L line from the account name.
+
+    Income roots are Income and their groups Revenue, or Other Income for 'non line'
+    accounts. Expense roots are Cost of Sales, Operating Expenses or Other Expenses; the
+    groups below Operating Expenses are split into depreciation, finance charges,
+    employee, administrative and selling costs. Groups below the other roots have no
+    line of their own."""
+    name = d.name.lower()
+    if d.root_type == "Income":
+        if not d.top_group:
+            return INCOME
+        return OTHER_INCOME if "non line" in name else REVENUE
+
+    if not d.top_group:
+        if "cost of" in name:
+            return COST_OF_SALES
+        if "operating expense" in name:
+            return OPERATING_EXPENSES
+        return OTHER_EXPENSES
+
+    if root_line != OPERATING_EXPENSES:
+        return None
+    if "depreciation & amortisation" in name:
+        return DEPRECIATION
+    if "finance charges" in name:
+        return FINANCE_COST
+    if "employee" in name:
+        return EMPLOYEE_BENEFITS
+    if "administrative" in name or "repairs" in name:
+        return ADMINISTRATIVE_EXPENSES
+    if "selling" in name or "marketing" in name:
+        return SELLING_EXPENSES
+    return OPERATING_EXPENSE
+
+
+def clear_pl_classification_cache(doc, method=None, *args):
+    frappe.cache().hdel(PL_CLASSIFICATION_CACHE_KEY, doc.company)
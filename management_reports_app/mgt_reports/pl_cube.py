@@ -0,0 +1,119 @@
+# Copyright (c) 2025, kunleadenuga and contributors
+# For license information, please see license.txt
+
+"""Numeric P&L cube shared by the GL reports.
+
+Report lines x periods x measures (actual, budget, variance, achievement) are kept in
+one float64 array. The lines come from a compiled layout (see pl_layout), which fills
+actuals, budgets and derived lines; variances and ratios are computed on the array and
+it is only turned into report rows (dicts keyed by period key + measure suffix) in
+to_rows.
+"""
+
+import numpy as np
+
+from frappe.utils import add_months, flt, getdate
+
+from management_reports_app.mgt_reports.budget_loader import MONTHS
+
+ACTUAL, BUDGET, VARIANCE, ACHIEVEMENT = range(4)
+
+# fieldname suffix of each measure, see the reports' get_columns
+MEASURE_SUFFIXES = ("", "_budget", "_variance", "_achivement")
+
+AMOUNT, RATIO, SPACER = "Amount", "Ratio", "Spacer"
+
+# measures of a ratio line; a ratio of variances means nothing, so those cells stay blank
+RATIO_MEASURES = [ACTUAL, BUDGET]
+
+
+class PLCube:
+    def __init__(self, period_list, lines):
+        """lines: dicts with label, indent, kind and row (extra fields of the rendered row)"""
+        self.period_list = period_list
+        self.period_keys = [period.key for period in period_list]
+        self.period_months = [(period.to_date_fiscal_year, get_period_months(period)) for period in period_list]
+        self.lines = lines
+        self.values = np.zeros((len(lines), len(self.period_keys), len(MEASURE_SUFFIXES)))
+
+    def row_vector(self, row):
+        return np.array([flt(row.get(key)) for key in self.period_keys])
+
+    def budget_vector(self, budget_matrix, account):
+        """Budget of an account over the periods, see budget_loader.get_budget_matrix"""
+        return np.array(
+            [
+                sum(budget_matrix.get(fiscal_year, {}).get(account, {}).get(month, 0.0) for month in months)
+                for fiscal_year, months in self.period_months
+            ]
+        )
+
+    def amount_lines(self):
+        return np.array([line.kind == AMOUNT for line in self.lines], dtype=bool)
+
+    def compute_variance(self):
+        """Variance (actual - budget) and achievement ((actual - budget) / actual in
+        percent, 0 without actuals) of every amount line"""
+        lines = self.amount_lines()
+        actual = self.values[lines, :, ACTUAL]
+        variance = actual - self.values[lines, :, BUDGET]
+        achievement = np.zeros_like(actual)
+        np.divide(variance * 100.0, actual, out=achievement, where=actual != 0)
+
+        self.values[lines, :, VARIANCE] = variance
+        self.values[lines, :, ACHIEVEMENT] = achievement
+
+    def set_ratio(self, index, numerator, denominator):
+        """Line index as sum(numerator lines) / sum(denominator lines) in percent for the
+        RATIO_MEASURES, 0 where the denominator is 0"""
+        numerator = self.values[numerator][:, :, RATIO_MEASURES].sum(axis=0)
+        denominator = self.values[denominator][:, :, RATIO_MEASURES].sum(axis=0)
+        ratio = np.zeros_like(numerator)
+        np.divide(numerator * 100.0, denominator, out=ratio, where=denominator != 0)
+
+        self.values[index] = 0.0
+        self.values[index][:, RATIO_MEASURES] = ratio
+
+    def to_rows(self, currency=None, measures=(ACTUAL, BUDGET, VARIANCE, ACHIEVEMENT)):
+        """Report rows for the lines, in order"""
+        fieldnames = [
+            (measure, [key + MEASURE_SUFFIXES[measure] for key in self.period_keys]) for measure in measures
+        ]
+
+        rows = []
+        for line, values in zip(self.lines, self.values):
+            if line.kind == SPACER:
+                rows.append({"account": None, "account_name": None})
+                continue
+
+            row = {"account": line.label, "account_name": line.label, "indent": line.indent}
+            for measure, keys in fieldnames:
+                cells = values[:, measure].tolist()
+                if line.kind == RATIO:
+                    cells = [f"{value:.2f}%" if measure in RATIO_MEASURES else None for value in cells]
+                row.update(zip(keys, cells))
+
+            if line.kind == AMOUNT:
+                row["currency"] = currency
+                row["total"] = float(values[:, ACTUAL].sum())
+
+            row.update(line.row)
+            rows.append(row)
+
+        return rows
+
+
+def get_fiscal_years(period_list):
+    """Fiscal years of the periods, as the tuple get_budget_matrix expects"""
+    return tuple(sorted({period.to_date_fiscal_year for period in period_list}))
+
+
+def get_period_months(period):
+    """Month keys ('jan', 'feb', ..) of the months a report period covers"""
+    month_keys = list(MONTHS.values())
+    months, month_start = [], getdate(period.from_date).replace(day=1)
+    while month_start <= getdate(period.to_date):
+        months.append(month_keys[month_start.month - 1])
+        month_start = getdate(add_months(month_start, 1))
+
+    return months
@@ -0,0 +1,311 @@
+# Copyright (c) 2025, kunleadenuga and contributors
+# For license information, please see license.txt
+
+"""Management P&L layouts of the GL reports.
+
+A layout is a list of lines:
+
+    amount(key, label, sources)    accounts of one or more P&L classes, e.g. {REVENUE: 1}
+    accounts(key, *classes)        one line per account of the classes
+    derived(key, label, **terms)   signed sum of other lines, e.g. revenue=1, cost_of_sales=-1
+    ratio(label, numerator, denominator)
+    SPACER
+
+Classes are the P&L lines of pl_classification. Terms and ratios refer to lines by key; an
+accounts() key stands for all of its lines and "key:P&L line" for those of one class.
+
+get_pl_layout compiles a layout against a company's chart of accounts once and caches it:
+the result holds the rendered lines and a weight matrix (lines x accounts) with the derived
+lines already folded in, so actuals, budgets and every derived line of a report are one
+matrix product each (see evaluate_layout).
+"""
+
+import numpy as np
+
+import frappe
+
+from management_reports_app.mgt_reports.account_tree import get_account_tree
+from management_reports_app.mgt_reports.pl_classification import (
+    ADMINISTRATIVE_EXPENSES,
+    COST_OF_SALES,
+    DEPRECIATION,
+    EMPLOYEE_BENEFITS,
+    EXPENSE_ROOTS,
+    FINANCE_COST,
+    INCOME,
+    OPERATING_EXPENSE_LINES,
+    OPERATING_EXPENSES,
+    OTHER_EXPENSES,
+    OTHER_INCOME,
+    REVENUE,
+    SELLING_EXPENSES,
+    get_pl_line_accounts,
+)
+from management_reports_app.mgt_reports.pl_cube import ACTUAL, AMOUNT, BUDGET, RATIO, SPACER, PLCube
+
+PL_LAYOUT_CACHE_KEY = "mgt_reports_pl_layout"
+
+
+def amount(key, label=None, sources=None, indent=0.0, budget=True, **row):
+    """Line of the accounts of sources ({class: sign} or a class). Without a label the
+    line is named after the first account of its first source."""
+    if isinstance(sources, str):
+        sources = {sources: 1}
+    return frappe._dict(
+        type="amount", key=key, label=label, sources=sources, indent=indent, budget=budget, row=row
+    )
+
+
+def accounts(key, *classes, indent=1.0, short_label=False):
+    """One line per account; short_label shows the account name without number and
+    company instead of the account"""
+    return frappe._dict(type="accounts", key=key, classes=classes, indent=indent, short_label=short_label)
+
+
+def derived(key, label, **terms):
+    return frappe._dict(type="derived", key=key, label=label, terms=terms)
+
+
+def ratio(label, numerator, denominator):
+    return frappe._dict(type="ratio", label=label, numerator=numerator, denominator=denominator)
+
+
+SPACER_LINE = frappe._dict(type="spacer")
+
+PROFIT_FOR_THE_YEAR = amount(
+    "profit_for_the_year",
+    "Profit for the year",
+    {INCOME: 1, **{root: -1 for root in EXPENSE_ROOTS}},
+    indent=None,
+    budget=False,
+    warn_if_negative=True,
+)
+
+MONTHLY_ACTUAL_VS_BUDGET = [
+    # line and non line revenue together
+    amount("revenue", "Revenue", {REVENUE: 1, OTHER_INCOME: 1}),
+    amount("cost_of_sales", sources=COST_OF_SALES),
+    SPACER_LINE,
+    derived("gross_profit", "Gross Profit", revenue=1, cost_of_sales=-1),
+    SPACER_LINE,
+    amount("operating_expenses_total", sources=OPERATING_EXPENSES),
+    accounts("other_expenses", OTHER_EXPENSES, indent=0.0, short_label=True),
+    accounts("operating_expenses", *OPERATING_EXPENSE_LINES),
+    SPACER_LINE,
+    derived("ebitda", "EBITDA", gross_profit=1, operating_expenses=-1),
+    SPACER_LINE,
+    amount("depreciation", "Depreciation & Amortisation Expenses", DEPRECIATION, indent=None),
+    derived("ebit", "EBIT", ebitda=1, depreciation=-1),
+    SPACER_LINE,
+    amount("finance_cost", "Finance Cost", FINANCE_COST, indent=None),
+    derived("profit_before_tax", "Profit Before Tax", ebit=1, finance_cost=-1),
+    SPACER_LINE,
+    PROFIT_FOR_THE_YEAR,
+    SPACER_LINE,
+]
+
+# Other Income on its own line, Operating Expenses without depreciation and finance charges
+OTHER_REVENUE = [
+    amount("revenue", "Revenue", REVENUE),
+    amount("cost_of_sales", sources=COST_OF_SALES),
+    SPACER_LINE,
+    derived("gross_profit", "Gross Profit", revenue=1, cost_of_sales=-1),
+    SPACER_LINE,
+    amount("other_income", "Other Income", OTHER_INCOME),
+    SPACER_LINE,
+    amount(
+        "operating_expenses_total", sources={OPERATING_EXPENSES: 1, DEPRECIATION: -1, FINANCE_COST: -1}
+    ),
+    accounts("operating_expenses", *OPERATING_EXPENSE_LINES),
+    accounts("other_expenses", OTHER_EXPENSES, indent=0.0, short_label=True),
+    SPACER_LINE,
+    derived("ebitda", "EBITDA", gross_profit=1, other_income=1, operating_expenses_total=-1),
+    SPACER_LINE,
+    amount("depreciation", "Depreciation & amortisation", DEPRECIATION, indent=None),
+    derived("ebit", "EBIT", ebitda=1, depreciation=-1),
+    SPACER_LINE,
+    amount("finance_cost", "Finance charges", FINANCE_COST, indent=None),
+    derived("profit_before_tax", "Profit Before Tax", ebit=1, finance_cost=-1),
+    SPACER_LINE,
+    PROFIT_FOR_THE_YEAR,
+    SPACER_LINE,
+]
+
+PRODUCTIVE = [
+    *OTHER_REVENUE,
+    SPACER_LINE,
+    SPACER_LINE,
+    ratio("COS Margin", ["cost_of_sales"], ["revenue"]),
+    ratio("HR Margin", [f"operating_expenses:{EMPLOYEE_BENEFITS}"], ["revenue"]),
+    ratio("Admin Cost Margin", [f"operating_expenses:{ADMINISTRATIVE_EXPENSES}"], ["revenue"]),
+    ratio("Appointment Generation & Markerting", [f"operating_expenses:{SELLING_EXPENSES}"], ["revenue"]),
+    ratio("EBITDA Margin", ["ebitda"], ["revenue"]),
+]
+
+PROFIT_AND_LOSS_SUMMARY = [
+    accounts("income", INCOME, indent=0.0, short_label=True),
+    amount("cost_of_sales", sources=COST_OF_SALES),
+    SPACER_LINE,
+    derived("gross_profit", "Gross Profit", income=1, cost_of_sales=-1),
+    amount("operating_expenses_total", sources=OPERATING_EXPENSES),
+    accounts("operating_expenses", *OPERATING_EXPENSE_LINES, DEPRECIATION, FINANCE_COST),
+    accounts("other_expenses", OTHER_EXPENSES, indent=0.0, short_label=True),
+    SPACER_LINE,
+    derived(
+        "ebitda",
+        "EBITDA",
+        gross_profit=1,
+        operating_expenses_total=-1,
+        depreciation=1,
+        finance_cost=1,
+    ),
+    SPACER_LINE,
+    amount("depreciation", "Depreciation & amortisation", DEPRECIATION, indent=None),
+    derived("ebit", "EBIT", ebitda=1, depreciation=-1),
+    SPACER_LINE,
+    amount("finance_cost", "Finance charges", FINANCE_COST, indent=None),
+    derived("profit_before_tax", "Profit Before Tax", ebit=1, finance_cost=-1),
+    SPACER_LINE,
+    PROFIT_FOR_THE_YEAR,
+    SPACER_LINE,
+]
+
+LAYOUTS = {
+    "Monthly Actual Vs Budget": MONTHLY_ACTUAL_VS_BUDGET,
+    "Monthly Actual Vs Budget (Other Revenue)": OTHER_REVENUE,
+    "Monthly Current month Vs Last month": OTHER_REVENUE,
+    "Productive Report": PRODUCTIVE,
+    "Profit and Loss Summary Statement": PROFIT_AND_LOSS_SUMMARY,
+}
+
+
+def get_pl_layout(report_name, company):
+    """Compiled layout of a report for a company, cached in redis"""
+    layouts = frappe.cache().hget(PL_LAYOUT_CACHE_KEY, company) or {}
+    if report_name not in layouts:
+        layouts[report_name] = compile_layout(LAYOUTS[report_name], company)
+        frappe.cache().hset(PL_LAYOUT_CACHE_KEY, company, layouts)
+
+    return layouts[report_name]
+
+
+def compile_layout(layout, company):
+    tree = get_account_tree(company)
+    classes = get_pl_line_accounts(company)
+
+    lines = []
+    # per line: {account: sign} for amount lines, {line index: sign} for derived lines
+    sources, terms = [], []
+    budgeted = []
+    # key -> line indexes, "key:P&L line" -> line indexes of that class
+    keys = {}
+    ratios = []
+
+    def add_line(label, indent=0.0, kind=AMOUNT, row=None):
+        lines.append(frappe._dict(label=label, indent=indent, kind=kind, row=row or {}))
+        sources.append({})
+        terms.append({})
+        budgeted.append(True)
+        return len(lines) - 1
+
+    def resolve(references):
+        indexes = []
+        for reference in references:
+            indexes.extend(keys.get(reference, []))
+        return indexes
+
+    for item in layout:
+        if item.type == "spacer":
+            add_line(None, kind=SPACER)
+
+        elif item.type == "amount":
+            line_accounts = {}
+            for source, sign in item.sources.items():
+                for account in classes.get(source, []):
+                    line_accounts[account] = line_accounts.get(account, 0) + sign
+
+            label = item.label
+            if not label:
+                first_source = next(iter(item.sources))
+                first_accounts = classes.get(first_source)
+                label = tree[first_accounts[0]].account_name if first_accounts else first_source
+
+            index = add_line(label, item.indent, row=item.row)
+            sources[index] = line_accounts
+            budgeted[index] = item.budget
+            keys[item.key] = [index]
+
+        elif item.type == "accounts":
+            keys[item.key] = []
+            class_accounts = [(account, source) for source in item.classes for account in classes.get(source, [])]
+            for account, source in sorted(class_accounts, key=lambda pair: tree[pair[0]].lft):
+                d = tree[account]
+                if item.short_label:
+                    index = add_line(d.account_name, item.indent)
+                else:
+                    account_name = f"{d.account_number} - {d.account_name}" if d.account_number else d.account_name
+                    index = add_line(account, item.indent, row={"account_name": account_name})
+                sources[index] = {account: 1}
+                keys[item.key].append(index)
+                keys.setdefault(f"{item.key}:{source}", []).append(index)
+
+        elif item.type == "derived":
+            index = add_line(item.label, indent=None)
+            terms[index] = item.terms
+            keys[item.key] = [index]
+
+        elif item.type == "ratio":
+            index = add_line(item.label, kind=RATIO)
+            ratios.append((index, item.numerator, item.denominator))
+
+    layout_accounts = list(dict.fromkeys(account for line_sources in sources for account in line_sources))
+    account_index = {account: i for i, account in enumerate(layout_accounts)}
+
+    weights = np.zeros((len(lines), len(layout_accounts)))
+    budget_weights = np.zeros((len(lines), len(layout_accounts)))
+    for index, line_sources in enumerate(sources):
+        for account, sign in line_sources.items():
+            weights[index, account_index[account]] += sign
+
+        if budgeted[index]:
+            budget_weights[index] = weights[index]
+
+    # in layout order, so derived lines above have been resolved to accounts already
+    for index, line_terms in enumerate(terms):
+        for reference, sign in line_terms.items():
+            for source in keys.get(reference, []):
+                weights[index] += sign * weights[source]
+                budget_weights[index] += sign * budget_weights[source]
+
+    return frappe._dict(
+        lines=lines,
+        accounts=layout_accounts,
+        weights=weights,
+        budget_weights=budget_weights,
+        ratios=[(index, resolve(numerator), resolve(denominator)) for index, numerator, denominator in ratios],
+    )
+
+
+def evaluate_layout(layout, period_list, rows, budget_matrix=None):
+    """PLCube of a compiled layout from report rows by account (get_income_and_expense)
+    and, for reports with budget columns, the budget matrix"""
+    cube = PLCube(period_list, layout.lines)
+    shape = (len(layout.accounts), len(cube.period_keys))
+
+    rows = {row.get("account"): row for row in rows if row.get("account")}
+    actuals = np.array([cube.row_vector(rows.get(account, {})) for account in layout.accounts])
+    cube.values[:, :, ACTUAL] = layout.weights @ actuals.reshape(shape)
+
+    if budget_matrix is not None:
+        budgets = np.array([cube.budget_vector(budget_matrix, account) for account in layout.accounts])
+        cube.values[:, :, BUDGET] = layout.budget_weights @ budgets.reshape(shape)
+        cube.compute_variance()
+
+    for index, numerator, denominator in layout.ratios:
+        cube.set_ratio(index, numerator, denominator)
+
+    return cube
+
+
+def clear_pl_layout_cache(doc, method=None, *args):
+    frappe.cache().hdel(PL_LAYOUT_CACHE_KEY, doc.company)
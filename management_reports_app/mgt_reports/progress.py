@@ -0,0 +1,103 @@
+# Copyright (c) 2025, kunleadenuga and contributors
+# For license information, please see license.txt
+
+"""Realtime progress and cancellation of report runs.
+
+A report's execute opens a run with start_progress and the code it calls marks steps
+with report_progress (a no-op outside a run, like instrumentation.record_stage). Every
+step is published to the user as a PROGRESS_EVENT, which public/js/report_progress.js
+shows as a progress bar.
+
+When the run is a Prepared Report job the event carries its name, and each step first
+checks whether cancel_report_run was called for it; a cancelled run stops with
+ReportCancelled, which ends the job and marks the Prepared Report as failed. Synchronous
+runs are below the prepared report threshold (see report_execution) and are not
+cancellable.
+"""
+
+import frappe
+from frappe import _
+from rq import get_current_job
+
+PROGRESS_EVENT = "mgt_report_progress"
+CANCEL_KEY = "mgt_reports_cancel"
+CANCEL_TTL = 60 * 60
+
+
+class ReportCancelled(frappe.ValidationError):
+    pass
+
+
+def start_progress(report_name, filters, steps):
+    frappe.local.mgt_report_progress = frappe._dict(
+        report=report_name,
+        filters=filters,
+        prepared_report=get_prepared_report_name(),
+        done=0,
+        total=steps,
+    )
+    check_cancelled()
+
+
+def report_progress(description):
+    """Close one step of the current run"""
+    progress = getattr(frappe.local, "mgt_report_progress", None)
+    if not progress:
+        return
+
+    check_cancelled()
+    progress.done = min(progress.done + 1, progress.total)
+    frappe.publish_realtime(
+        PROGRESS_EVENT,
+        {
+            "report": progress.report,
+            "prepared_report": progress.prepared_report,
+            "filters": progress.filters,
+            "done": progress.done,
+            "total": progress.total,
+            "description": description,
+        },
+        user=frappe.session.user,
+    )
+
+
+def check_cancelled():
+    progress = getattr(frappe.local, "mgt_report_progress", None)
+    if progress and progress.prepared_report and frappe.cache().get_value(
+        get_cancel_key(progress.prepared_report), expires=True
+    ):
+        frappe.local.mgt_report_progress = None
+        raise ReportCancelled(_("Report run cancelled"))
+
+
+def get_prepared_report_name():
+    """Prepared Report generated by the current background job, if any"""
+    job = get_current_job()
+    if job:
+        # frappe.enqueue passes the method's arguments as kwargs of execute_job
+        return (job.kwargs.get("kwargs") or {}).get("prepared_report")
+
+
+@frappe.whitelist()
+def cancel_report_run(prepared_report):
+    doc = frappe.get_doc("Prepared Report", prepared_report)
+    if doc.owner != frappe.session.user and "System Manager" not in frappe.get_roles():
+        frappe.throw(_("Only the user who started a report run can cancel it"), frappe.PermissionError)
+
+    if doc.status in ("Queued", "Started"):
+        frappe.cache().set_value(get_cancel_key(doc.name), 1, expires_in_sec=CANCEL_TTL)
+
+
+def get_cancel_key(prepared_report):
+    return f"{CANCEL_KEY}|{prepared_report}"
+
+
+def finish_progress(description):
+    """Close the last step of the current run, whatever steps it skipped"""
+    progress = getattr(frappe.local, "mgt_report_progress", None)
+    if not progress:
+        return
+
+    progress.done = progress.total - 1
+    report_progress(description)
+    frappe.local.mgt_report_progress = None
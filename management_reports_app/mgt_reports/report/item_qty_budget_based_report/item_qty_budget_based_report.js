@@ -55,6 +55,40 @@ function get_filters() {
 				frappe.query_report.refresh();
 			},
 		},
+		{
+			fieldname: "group_by",
+			label: __("Group By"),
+			fieldtype: "Select",
+			options: [
+				{ value: "Item Group", label: __("Item Group") },
+				{ value: "Item Code", label: __("Item Code") },
+			],
+			default: "Item Group",
+			description: __("Item codes have no budget, budgets are set per item group. They are shown for a Top N only."),
+			on_change: function () {
+				// every item code is too many rows for the report view
+				if (frappe.query_report.get_filter_value("group_by") === "Item Code"
+					&& !frappe.query_report.get_filter_value("top_n")) {
+					frappe.query_report.set_filter_value("top_n", 20);
+					return;
+				}
+				frappe.query_report.refresh();
+			},
+		},
+		{
+			fieldname: "rollup_level",
+			label: __("Item Group Level"),
+			fieldtype: "Int",
+			default: 0,
+			description: __("Roll item groups up to this level of the tree (1 is the level below All Item Groups). 0 shows the item groups as sold."),
+		},
+		{
+			fieldname: "top_n",
+			label: __("Top N"),
+			fieldtype: "Int",
+			default: 0,
+			description: __("The rest are summed up as Others. 0 shows every item group; item codes need a Top N."),
+		},
 	];
 
 	return filters;
@@ -202,6 +202,8 @@ management_reports_app.monthly_actual_vs_budget = {
 	parent_field: "parent_account",
 	initial_depth: 3,
 	onload: function (report) {
+		management_reports_app.report_progress.setup(report);
+
 		// dropdown for links to other financial statements
 		erpnext.financial_statements.filters = get_filters();
 
@@ -272,22 +272,11 @@ management_reports_app.monthly_actual_vs_budget = {
 	parent_field: "parent_account",
 	initial_depth: 3,
 	onload: function (report) {
+		management_reports_app.report_progress.setup(report);
+
 		// dropdown for links to other financial statements
 		erpnext.financial_statements.filters = get_filters();
 
-		let fiscal_year = erpnext.utils.get_fiscal_year(frappe.datetime.get_today());
-		var filters = report.get_values();
-
-		if (!filters.period_start_date || !filters.period_end_date) {
-			frappe.model.with_doc("Fiscal Year", fiscal_year, function (r) {
-				var fy = frappe.model.get_doc("Fiscal Year", fiscal_year);
-				frappe.query_report.set_filter_value({
-					period_start_date: fy.year_start_date,
-					period_end_date: fy.year_end_date,
-				});
-			});
-		}
-
 		// if (report.page) {
 		// 	// const views_menu = report.page.add_custom_button_group(__("Financial Statements"));
 
@@ -326,73 +315,11 @@ function get_filters() {
 		// 	options: "Finance Book",
 		// },
 		{
-			fieldname: "filter_based_on",
-			label: __("Filter Based On"),
-			fieldtype: "Select",
-			options: ["Fiscal Year"],
-			// options: ["Fiscal Year", "Date Range"],
-			default: ["Fiscal Year"],
-			reqd: 1,
-			on_change: function () {
-				let filter_based_on = frappe.query_report.get_filter_value("filter_based_on");
-				frappe.query_report.toggle_filter_display(
-					"from_fiscal_year",
-					filter_based_on === "Date Range"
-				);
-				frappe.query_report.toggle_filter_display("to_fiscal_year", filter_based_on === "Date Range");
-				frappe.query_report.toggle_filter_display(
-					"period_start_date",
-					filter_based_on === "Fiscal Year"
-				);
-				frappe.query_report.toggle_filter_display(
-					"period_end_date",
-					filter_based_on === "Fiscal Year"
-				);
-
-				frappe.query_report.refresh();
-			},
-		},
-		{
-			fieldname: "period_start_date",
-			label: __("Start Date"),
+			fieldname: "as_of_date",
+			label: __("Current Month"),
 			fieldtype: "Date",
-			reqd: 1,
-			depends_on: "eval:doc.filter_based_on == 'Date Range'",
-		},
-		{
-			fieldname: "period_end_date",
-			label: __("End Date"),
-			fieldtype: "Date",
-			reqd: 1,
-			depends_on: "eval:doc.filter_based_on == 'Date Range'",
-		},
-		{
-			fieldname: "from_fiscal_year",
-			label: __("Start Year"),
-			fieldtype: "Link",
-			options: "Fiscal Year",
-			reqd: 1,
-			depends_on: "eval:doc.filter_based_on == 'Fiscal Year'",
-		},
-		{
-			fieldname: "to_fiscal_year",
-			label: __("End Year"),
-			fieldtype: "Link",
-			options: "Fiscal Year",
-			reqd: 1,
-			depends_on: "eval:doc.filter_based_on == 'Fiscal Year'",
-		},
-		{
-			fieldname: "periodicity",
-			label: __("Periodicity"),
-			fieldtype: "Select",
-			options: [
-				{ value: "Monthly", label: __("Monthly") },
-				// { value: "Quarterly", label: __("Quarterly") },
-				// { value: "Half-Yearly", label: __("Half-Yearly") },
-				// { value: "Yearly", label: __("Yearly") },
-			],
-			default: "Monthly",
+			// the last closed month
+			default: frappe.datetime.add_months(frappe.datetime.get_today(), -1),
 			reqd: 1,
 		},
 		// Note:
@@ -427,18 +354,6 @@ function get_filters() {
 		// },
 	];
 
-	// Dynamically set 'default' values for fiscal year filters
-	let fy_filters = filters.filter((x) => {
-		return ["from_fiscal_year", "to_fiscal_year"].includes(x.fieldname);
-	});
-	let fiscal_year = erpnext.utils.get_fiscal_year(frappe.datetime.get_today(), false, true);
-	if (fiscal_year) {
-		let fy = erpnext.utils.get_fiscal_year(frappe.datetime.get_today(), false, false);
-		fy_filters.forEach((x) => {
-			x.default = fy;
-		});
-	}
-
 	return filters;
 }
 
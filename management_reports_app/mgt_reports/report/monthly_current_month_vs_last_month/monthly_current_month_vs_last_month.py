@@ -4,409 +4,110 @@
 
 import frappe
 from frappe import _
-from frappe.utils import flt
+from frappe.utils import add_months, formatdate, get_first_day, get_last_day, getdate, nowdate
 
-from erpnext.accounts.report.financial_statements import (
-    compute_growth_view_data,
-    compute_margin_view_data,
-    get_data,
-    get_filtered_list_for_consolidated_report,
-    get_period_list,
-)
+from erpnext.accounts.utils import get_fiscal_year
 
-from erpnext.accounts.report.budget_variance_report.budget_variance_report import (
-    execute as budget_variance_report
-)
+from management_reports_app.mgt_reports.budget_loader import get_budget_matrix
+from management_reports_app.mgt_reports.gl_aggregation import get_income_and_expense
+from management_reports_app.mgt_reports.instrumentation import profile_report, record_stage
+from management_reports_app.mgt_reports.pl_cube import get_fiscal_years, get_period_months
+from management_reports_app.mgt_reports.pl_layout import evaluate_layout, get_pl_layout
+from management_reports_app.mgt_reports.progress import finish_progress, report_progress, start_progress
+from management_reports_app.mgt_reports.result_cache import GL_SOURCES, cache_report_result
 
-from frappe.utils import getdate, add_months, nowdate
 
-current_month = getdate(add_months(nowdate(), -1)).strftime('%Y-%m').split("-")[1]
-current_year = getdate(add_months(nowdate(), -1)).strftime('%Y-%m').split("-")[0]
-last_month = getdate(add_months(nowdate(), -2)).strftime('%Y-%m').split("-")[1]
-last_year = getdate(add_months(nowdate(), -2)).strftime('%Y-%m').split("-")[0]
+def get_as_of_date(filters):
+    # the month of the as of date is the current month; without one, the last closed month
+    return getdate(filters.as_of_date or add_months(nowdate(), -1))
 
-frappe.log_error(current_month, last_month)
 
-number_to_month_name = {
-        '01': 'jan',
-        '02': 'feb',
-        '03': 'mar',
-        '04': 'apr',
-        '05': 'may',
-        '06': 'jun',
-        '07': 'jul',
-        '08': 'aug',
-        '09': 'sep',
-        '10': 'oct',
-        '11': 'nov',
-        '12': 'dec'
-    }
+def get_key_filters(filters):
+    """Filters the result is cached under: a run without an as of date is one for the
+    last closed month, and not served once the month rolls over"""
+    return frappe._dict(filters, as_of_date=get_as_of_date(filters))
 
 
+@profile_report("Monthly Current month Vs Last month")
+@cache_report_result("Monthly Current month Vs Last month", GL_SOURCES, get_key_filters)
 def execute(filters=None):
-    
-    if current_month == "01":
-        filters.from_fiscal_year = int(filters.from_fiscal_year) - 1
-
-    period_list = get_period_list(
-        filters.from_fiscal_year,
-        filters.to_fiscal_year,
-        filters.period_start_date,
-        filters.period_end_date,
-        filters.filter_based_on,
-        filters.periodicity,
-        company=filters.company,
-    )
-
-    income = get_data(
-        filters.company,
-        "Income",
-        "Credit",
-        period_list,
-        filters=filters,
-        accumulated_values=filters.accumulated_values,
-        ignore_closing_entries=True,
-        ignore_accumulated_values_for_fy=True,
-    )
-
-    expense = get_data(
-        filters.company,
-        "Expense",
-        "Debit",
-        period_list,
-        filters=filters,
-        accumulated_values=filters.accumulated_values,
-        ignore_closing_entries=True,
-        ignore_accumulated_values_for_fy=True,
-    )
-
-    net_profit_loss = get_net_profit_loss(
-        income, expense, period_list, filters.company, filters.presentation_currency
-    )
-
-    data = []
-    data.extend(income or [])
-    data.extend(expense or [])
-    
-    frappe.log_error("Income", income)
-    frappe.log_error("Expense", expense)
-
-    empty_row = None
-    for exp in expense:
-        if exp.get('indent') == 0.0:
-            empty_row = {key: None for key in exp.keys()}
-            break
-    
-    # months = ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec']
+    # the progress events carry the filters as submitted, see report_progress.js
+    submitted_filters = frappe._dict(filters)
+    filters.as_of_date = get_as_of_date(filters)
+    filters.periodicity = "Monthly"
+    filters.accumulated_values = 0
 
-    # for month in months:
-    #     empty_row[f'budget_{month}']
+    period_list = get_month_periods(filters.company, filters.as_of_date)
+    fiscal_years = get_fiscal_years(period_list)
+    start_progress("Monthly Current month Vs Last month", submitted_filters, steps=len(fiscal_years) + 4)
 
-    filtered_data = calculate_financial_metrics(income, expense, filters)
+    income, expense = get_income_and_expense(filters, period_list)
+    record_stage("fetch_gl", income=len(income or []), expense=len(expense or []))
 
+    months = tuple(month for period in period_list for month in get_period_months(period))
+    budget_matrix = get_budget_matrix(filters.company, fiscal_years, months=months)
+    record_stage("budget", fiscal_years=len(budget_matrix))
 
-
-    if net_profit_loss:
-        data.append(net_profit_loss)
+    layout = get_pl_layout("Monthly Current month Vs Last month", filters.company)
+    cube = evaluate_layout(layout, period_list, (income or []) + (expense or []), budget_matrix)
+    record_stage("metrics", rows=len(cube.lines))
+    report_progress(_("Metrics computed"))
 
     columns = get_columns(filters.periodicity, period_list, filters.accumulated_values, filters.company)
+    record_stage("columns", columns=len(columns))
 
     currency = filters.presentation_currency or frappe.get_cached_value(
         "Company", filters.company, "default_currency"
     )
-    # chart = get_chart_data(filters, columns, income, expense, net_profit_loss, currency)
-
-    # report_summary, primitive_summary = get_report_summary(
-    #     period_list, filters.periodicity, income, expense, net_profit_loss, currency, filters
-    # )
-
-    if filters.get("selected_view") == "Growth":
-        compute_growth_view_data(data, period_list)
-
-    if filters.get("selected_view") == "Margin":
-        compute_margin_view_data(data, period_list, filters.accumulated_values)
-
-
-    # if filters.get("from_fiscal_year"):
-    
 
-    # Load Our Custom Modified data
-    # if not (filters.get("selected_view") == "Growth" or filters.get("selected_view") == "Margin"):
-
-    frappe.log_error("columns", columns)
     for col in columns:
             if col.get('fieldname') == 'account':
                 col['fieldtype'] = 'Data'
                 col['label'] = ''
 
-    data = []
-    data.extend(filtered_data or [])
-    if net_profit_loss:
-        data.append(net_profit_loss)
-
-    # for key in data[0]:
-    #     empty_row[key] = None
-
-    filters['period'] = filters.get('periodicity')
-    filters['budget_against'] = "Cost Center"
-    _, budget_data, _, _ = budget_variance_report(filters)
-    frappe.log_error("budget_data", budget_data)
-
-    budget_grouping = [
-        {
-            'account': '7001 - Revenue from ordinary line of Business - SSWCH',
-            'budget': 0,
-            'row': 'Revenue'
-        },
-        {
-            'account': '7400 - Revenue from Non line of business - SSWCH',
-            'budget': 0,
-            'row': 'Other Expenses'
-        }
-    ]
-
-    year_list = [str(year) for year in range(int(filters['from_fiscal_year']), int(filters['to_fiscal_year']) + 1)]
-
-    # Fetch budgets using the year list
-    budgets = frappe.db.get_all(
-        "Budget",
-        filters={
-            'company': filters.company,
-            'budget_against': 'Cost Center',
-            'fiscal_year': ['in', year_list],  # Use the generated year list
-            'docstatus': 1  # Ensure only submitted budgets are fetched
-        },
-    )
-
-
-    budget_grouping_on_parent = {}
-    for b in budgets:
-        current_budget = frappe.get_doc("Budget", b)
-        budget_grouping_on_parent[current_budget.fiscal_year] = {}
-        
-        for budget_row in current_budget.accounts:
-            account = frappe.get_doc("Account", budget_row.account)
-        #    account.parent_account
-            current_parent = account.parent_account
-            parent_acc_doc = {}
-            parent_acc_doc['parent_account'] = True #in start
-            prev_acc = None
-            # budget_amount = 0
-
-            
-            while(True):
-                parent_acc_doc = frappe.get_doc("Account", current_parent)
-                # if hasattr(parent_acc_doc, 'parent_account') and parent_acc_doc.parent_account:
-                if not parent_acc_doc.parent_account and parent_acc_doc.is_group:
-                    if 'cost of sales' in parent_acc_doc.name.lower():
-                        prev_acc = parent_acc_doc
-                        # so we will get the sum in the Cost Of Sales not in its child like direct and stock expenses
-                    break
-
-                prev_acc = parent_acc_doc
-                current_parent = parent_acc_doc.parent_account
-                
-            if prev_acc:
-                # Check if the account name exists in the dictionary
-                key_name = prev_acc.name.split("-")[1].strip()
-                if key_name not in budget_grouping_on_parent[current_budget.fiscal_year]:
-                    # 7001 - Revenue from ordinary line of Business - SSWCH to Revenue from ordinary line of Business
-                    budget_grouping_on_parent[current_budget.fiscal_year][key_name] = 0
-
-                # Add the budget amount
-                budget_grouping_on_parent[current_budget.fiscal_year][key_name] += budget_row.budget_amount
-
-            if parent_acc_doc:
-                key_name = parent_acc_doc.name.split("-")[1].strip()
-                if key_name not in budget_grouping_on_parent[current_budget.fiscal_year]:
-                    # 7001 - Revenue from ordinary line of Business - SSWCH to Revenue from ordinary line of Business
-                    budget_grouping_on_parent[current_budget.fiscal_year][key_name] = 0
-                budget_grouping_on_parent[current_budget.fiscal_year][key_name] += budget_row.budget_amount
-
-    # frappe.log_error("empty row", empty_row)
-    frappe.log_error("budget grouping on parent", budget_grouping_on_parent)
-            
-    data.append(empty_row)
-
-    # Revenue (line)
-    months = ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec']
-
-    map_month = {
-        'January': 'jan',
-        'February': 'feb',
-        'March': 'mar',
-        'April': 'apr',
-        'May': 'may',
-        'June': 'jun',
-        'July': 'jul',
-        'August': 'aug',
-        'September': 'sep',
-        'October': 'oct',
-        'November': 'nov',
-        'December': 'dec'
-    }
-
-
-    for b in budgets:
-        current_budget = frappe.get_doc("Budget", b)
-        if current_budget.monthly_distribution:
-            monthly_distribution = frappe.get_doc("Monthly Distribution", current_budget.monthly_distribution)
-
-        for budget_year in budget_grouping_on_parent:
-
-            for monthly_row in monthly_distribution.percentages:
-                month = map_month[monthly_row.month] 
-
-                actual_key_name = f'{month}_{budget_year}'
-                budget_key_name = f'{month}_{budget_year}_budget'  
-                achive_key_name = f'{month}_{budget_year}_achivement'  
-                variance_key_name = f'{month}_{budget_year}_variance'  
-                
-
-                data[0][budget_key_name] = f"{((budget_grouping_on_parent[budget_year]['Revenue from ordinary line of Business'] * monthly_row.percentage_allocation)/100):.3f}"
-
-                data[1][budget_key_name] = f"{((budget_grouping_on_parent[budget_year]['Cost of Sales'] * monthly_row.percentage_allocation)/100):.3f}"
-
-                data[2][budget_key_name] = None
-                
-                # Update budget values for data[3] and data[5]
-                data[3][budget_key_name] = float(data[0][budget_key_name]) - float(data[1][budget_key_name])
-
-                data[5][budget_key_name] = f"{((budget_grouping_on_parent[budget_year]['Revenue from Non line of business'] * monthly_row.percentage_allocation) / 100):.3f}"
-
-                data[7][budget_key_name] = f"{((budget_grouping_on_parent[budget_year]['Operating Expenses'] * monthly_row.percentage_allocation) / 100):.3f}"
-
-                data[8][budget_key_name] = f"{((budget_grouping_on_parent[budget_year]['Administrative Expenses'] * monthly_row.percentage_allocation) / 100):.3f}"
-
-                data[9][budget_key_name] = f"{((budget_grouping_on_parent[budget_year]['Repairs & maintenance Expenses'] * monthly_row.percentage_allocation) / 100):.3f}"
-
-                data[10][budget_key_name] = f"{((budget_grouping_on_parent[budget_year]['Impairment charges'] * monthly_row.percentage_allocation) / 100):.3f}"
-
-                data[11][budget_key_name] = f"{((budget_grouping_on_parent[budget_year]['Selling, distribution & marketing expenses'] * monthly_row.percentage_allocation) / 100):.3f}"
-
-                data[12][budget_key_name] = f"{((budget_grouping_on_parent[budget_year]['Employees Benefit Expenses'] * monthly_row.percentage_allocation) / 100):.3f}"
-
-                # data[14][budget_key_name] = f"{(data[3][budget_key_name] - data[7][budget_key_name] + data[5][budget_key_name]):.3f}"
-                data[14][budget_key_name] = f"{(float(data[3][budget_key_name]) - float(data[7][budget_key_name]) + float(data[5][budget_key_name])):.3f}"
-
-                data[16][budget_key_name] = f"{((budget_grouping_on_parent[budget_year]['Depreciation & amortisation expenses'] * monthly_row.percentage_allocation) / 100):.3f}"
-
-                # data[17][budget_key_name] = f"{(data[14][budget_key_name] - data[16][budget_key_name]):.3f}"
-                data[17][budget_key_name] = f"{(float(data[14][budget_key_name]) - float(data[16][budget_key_name])):.3f}"
-
-                data[19][budget_key_name] = f"{((budget_grouping_on_parent[budget_year]['Finance charges'] * monthly_row.percentage_allocation) / 100):.3f}"
-
-                # data[20][budget_key_name] = f"{(data[17][budget_key_name] - data[19][budget_key_name]):.3f}"
-                data[20][budget_key_name] = f"{(float(data[17][budget_key_name]) - float(data[19][budget_key_name])):.3f}"
-
-
-
-        # Achivement and Variance columns
-    start_year = int(filters.get('from_fiscal_year'))
-    end_year = int(filters.get('to_fiscal_year'))
-
-    while(start_year<=end_year):
-        for i, row in enumerate(data):
-
-            if not row['account']:
-                    continue
-
-            for month in months:
-
-                actual_key_name = f'{month}_{start_year}'
-                budget_key_name = f'{month}_{start_year}_budget'  
-                achive_key_name = f'{month}_{start_year}_achivement'  
-                variance_key_name = f'{month}_{start_year}_variance'  
-
-                act = float(data[i][actual_key_name]) or 0
-                bud = float(data[i].get(budget_key_name, 0)) 
-
-                if act:
-                    data[i][achive_key_name] = f"{(((act - bud) / act) * 100.0):.3f}"
-                else:
-                    data[i][achive_key_name] = 0
-
-                data[i][variance_key_name] = act - bud
-
-                
-        start_year += 1
-        
-    # current_month_key = f"{number_to_month_name[current_month]}_{current_year}"
-    # last_month_key = f"{number_to_month_name[last_month]}_{last_year}"
-
-    # # Required keys
-    # required_keys = {"account", "parent_account", "indent", "account_name", current_month_key, last_month_key}
-
-    # # Filter the data
-    # filtered_data = [
-    #     {key: value for key, value in entry.items() if key in required_keys}
-    #     for entry in data
-    # ]
-
-
-    filtered_data = filter_monthly_data(
-    data=data,
-    current_month=current_month,
-    current_year=current_year,
-    last_month=last_month,
-    last_year=last_year
-    )
-
-
-
-    return columns, filtered_data, None, None, None, None
+    data = cube.to_rows(currency)
+    record_stage("rows", rows=len(data))
+    finish_progress(_("Report ready"))
+
+    return columns, data, None, None, None, None
+
+
+def get_month_periods(company, as_of_date):
+    """Last month and the month of as_of_date, shaped like the periods of erpnext's
+    get_period_list with Monthly periodicity"""
+    period_list = []
+    for months in (-1, 0):
+        from_date = get_first_day(add_months(as_of_date, months))
+        to_date = get_last_day(from_date)
+        fiscal_year, year_start_date, year_end_date = get_fiscal_year(to_date, company=company)
+        period_list.append(
+            frappe._dict(
+                key=to_date.strftime("%b_%Y").lower(),
+                label=formatdate(to_date, "MMM YYYY"),
+                from_date=from_date,
+                to_date=to_date,
+                year_start_date=getdate(year_start_date),
+                year_end_date=getdate(year_end_date),
+                from_date_fiscal_year=fiscal_year,
+                to_date_fiscal_year=fiscal_year,
+            )
+        )
 
+    return period_list
 
 
-def filter_monthly_data(data, current_month, current_year, last_month, last_year):
+def get_columns(periodicity, period_list, accumulated_values=0, company=None, cash_flow=False):
     """
-    Filter dictionary to keep only account details and relevant month columns.
+    Generate columns for report showing the current and last month.
     
     Args:
-        data (list): List of dictionaries containing financial data
-        current_month (str): Current month as 2-digit string (e.g., '01')
-        current_year (str): Current year (e.g., '2025')
-        last_month (str): Last month as 2-digit string (e.g., '12')
-        last_year (str): Last year (e.g., '2024')
-    
-    Returns:
-        list: Filtered list of dictionaries
+        periodicity (str): Periodicity of the report
+        period_list (list): List of period objects containing key and label
+        accumulated_values (int, optional): Flag for accumulated values. Defaults to 0
+        company (str, optional): Company name. Defaults to None
+        cash_flow (bool, optional): Flag for cash flow report. Defaults to False
     """
-    # Month number to name mapping
-    number_to_month_name = {
-        '01': 'jan', '02': 'feb', '03': 'mar', '04': 'apr',
-        '05': 'may', '06': 'jun', '07': 'jul', '08': 'aug',
-        '09': 'sep', '10': 'oct', '11': 'nov', '12': 'dec'
-    }
-    
-    # Generate the month_year keys we want to keep
-    current_month_key = f"{number_to_month_name[current_month]}_{current_year}"
-    last_month_key = f"{number_to_month_name[last_month]}_{last_year}"
-    
-    # Define the required keys (base fields + month columns)
-    required_keys = {
-        "account",
-        "parent_account",
-        "indent",
-        "account_name",
-        current_month_key,
-        last_month_key
-    }
-    
-    # Filter the data
-    filtered_data = [
-        {key: value for key, value in entry.items() if key in required_keys}
-        for entry in data
-    ]
-
-    frappe.log_error("filtered data", filtered_data)
-    
-    return filtered_data
-
-
-
-
-def get_columns_old(periodicity, period_list, accumulated_values=0, company=None, cash_flow=False):
+    # Initialize columns with account field
     columns = [
         {
             "fieldname": "account",
@@ -416,6 +117,8 @@ def get_columns_old(periodicity, period_list, accumulated_values=0, company=None
             "width": 300,
         }
     ]
+
+    # Add company currency column if company is provided
     if company:
         columns.append(
             {
@@ -426,9 +129,9 @@ def get_columns_old(periodicity, period_list, accumulated_values=0, company=None
                 "hidden": 1,
             }
         )
+
+    # Add period columns for last and current month
     for period in period_list:
-        # "fieldname": f"budget_({month})_{year}",
-        # "fieldname": f"variance_({month})_{year}",
         columns += [
             {
                 "fieldname": f"{period.key}",
@@ -462,431 +165,7 @@ def get_columns_old(periodicity, period_list, accumulated_values=0, company=None
                 "label": "",
                 "fieldtype": "Data",
                 "width": 80,
-            },
-        ]
-    # if periodicity != "Yearly":
-    #     if not accumulated_values:
-    #         columns.append(
-    #             {
-    #                 "fieldname": "total",
-    #                 "label": _("Total"),
-    #                 "fieldtype": "Currency",
-    #                 "width": 150,
-    #                 "options": "currency",
-    #             }
-    #         )
-
-    return columns
-
-
-def get_columns(periodicity, period_list, accumulated_values=0, company=None, cash_flow=False):
-    """
-    Generate columns for report showing only current and last month data.
-    
-    Args:
-        periodicity (str): Periodicity of the report
-        period_list (list): List of period objects containing key and label
-        accumulated_values (int, optional): Flag for accumulated values. Defaults to 0
-        company (str, optional): Company name. Defaults to None
-        cash_flow (bool, optional): Flag for cash flow report. Defaults to False
-    """
-    # Get current and last month info
-    current_month = getdate(nowdate()).strftime('%m')
-    current_year = getdate(nowdate()).strftime('%Y')
-    last_month = getdate(add_months(nowdate(), -1)).strftime('%m')
-    last_year = getdate(add_months(nowdate(), -1)).strftime('%Y')
-
-    # Month number to name mapping
-    number_to_month_name = {
-        '01': 'jan', '02': 'feb', '03': 'mar', '04': 'apr',
-        '05': 'may', '06': 'jun', '07': 'jul', '08': 'aug',
-        '09': 'sep', '10': 'oct', '11': 'nov', '12': 'dec'
-    }
-    
-    # Generate the month_year keys we want to keep
-    current_month_key = f"{number_to_month_name[current_month]}_{current_year}"
-    last_month_key = f"{number_to_month_name[last_month]}_{last_year}"
-
-    # Initialize columns with account field
-    columns = [
-        {
-            "fieldname": "account",
-            "label": _("Account") if not cash_flow else _("Section"),
-            "fieldtype": "Link",
-            "options": "Account",
-            "width": 300,
-        }
-    ]
-
-    # Add company currency column if company is provided
-    if company:
-        columns.append(
-            {
-                "fieldname": "currency",
-                "label": _("Currency"),
-                "fieldtype": "Link",
-                "options": "Currency",
-                "hidden": 1,
             }
-        )
-
-    # Add period columns only for current and last month
-    for period in period_list:
-        if period.key in [current_month_key, last_month_key]:
-            columns += [
-                {
-                    "fieldname": f"{period.key}",
-                    "label": f"Actual ({period.label})",
-                    "fieldtype": "Currency",
-                    "options": "currency",
-                    "width": 150,
-                },
-                {
-                    "fieldname": f"{period.key}_budget",
-                    "label": f"Budget ({period.label})",
-                    "fieldtype": "Currency",
-                    "options": "currency",
-                    "width": 150,
-                },
-                {
-                    "fieldname": f"{period.key}_achivement",
-                    "label": f"% Ach ({period.label})",
-                    "fieldtype": "Percent",
-                    "width": 150,
-                },
-                {
-                    "fieldname": f"{period.key}_variance",
-                    "label": f"Variance ({period.label})",
-                    "fieldtype": "Currency",
-                    "options": "currency",
-                    "width": 150,
-                },
-                {
-                    "fieldname": "empty_column",
-                    "label": "",
-                    "fieldtype": "Data",
-                    "width": 80,
-                }
-            ]
+        ]
 
     return columns
-
-
-def calculate_financial_metrics(income, expense, filters):
-    filtered_data = []
-    
-    # Process income entries
-    frappe.log_error("income", income)
-    # for inc in income:
-    #     if inc.get('indent') == 0.0:
-    #         inc['account_name'] = inc.get('account').split(" - ")[1]
-    #         inc['account'] = inc.get('account_name')
-    #         filtered_data.append(inc)
-    
-    revenue_row =  {'account_name': 'Revenue', 'account': 'Revenue'}
-    # other_income_row =  {'account_name': 'Other Income', 'account': 'Other Income'}
-    other_income_row =  None
-    for inc in income:
-        if inc.get('indent') == 1.0 and "Non line".lower() in inc.get('account').lower():
-            inc['account_name'] = "Other Income"
-            inc['account'] = "Other Income"
-            inc['indent'] = 0.0
-            other_income_row = inc
-        if inc.get('indent') == 1.0 and not "Non line".lower() in inc.get('account').lower():
-            inc['account_name'] = "Revenue"
-            inc['account'] = "Revenue"
-            inc['indent'] = 0.0
-            filtered_data.append(inc)
-
-    # Initialize rows
-    empty_row = None
-    depreciation_row = {'account_name': 'Depreciation & Amortisation Expenses', 
-                       'account': 'Depreciation & Amortisation Expenses'}
-    finance_cost_row = {'account_name': 'Finance Cost', 
-                       'account': 'Finance Cost'}
-    gross_profit = None
-    operating_expenses = None
-
-    # Process expense entries
-    for exp in expense:
-        if exp.get('indent') == 0.0:
-            empty_row = {key: None for key in exp.keys()}
-
-            exp['account_name'] = exp.get('account').split(" - ")[1]
-            exp['account'] = exp.get('account_name')
-            filtered_data.append(exp)
-            
-            # Calculate Gross Profit when cost entry is found
-            if 'cost of' in exp.get('account_name').lower():
-                # Initialize gross profit with all keys
-                gross_profit = {key: None for key in exp.keys()}
-                
-                # Set the text fields
-                gross_profit['account'] = 'Gross Profit'
-                gross_profit['account_name'] = 'Gross Profit'
-                
-                # Calculate numeric fields
-                for key in gross_profit:
-                    if key not in ['account', 'account_name', 'indent']:
-                        try:
-                            value1 = filtered_data[0].get(key, 0)
-                            value2 = filtered_data[1].get(key, 0)
-                            
-                            if isinstance(value1, (int, float, str)) and isinstance(value2, (int, float, str)):
-                                try:
-                                    gross_profit[key] = float(value1 or 0) - float(value2 or 0)
-                                except (ValueError, TypeError):
-                                    gross_profit[key] = None
-                        except (ValueError, TypeError):
-                            gross_profit[key] = None
-                            
-                filtered_data.append(empty_row)
-                filtered_data.append(gross_profit)
-                filtered_data.append(empty_row)
-                filtered_data.append(other_income_row)
-                filtered_data.append(empty_row)
-                
-        if exp.get('indent') == 1.0:
-            if 'operating expense' in exp.get('parent_account').lower() and "Depreciation & amortisation expenses".lower() not in exp.get("account").lower() and "Finance charges".lower()  not in exp.get("account").lower():
-                # exp['indent'] = 0.0
-                filtered_data.append(exp)
-
-    
-    # Initialize rows with all fields from exp
-    depreciation_row = {key: None for key in exp.keys()}
-    finance_cost_row = {key: None for key in exp.keys()}
-    # empty_row = {key: None for key in exp.keys()}
-    
-    # Set basic info for rows
-    depreciation_row['account'] = 'Depreciation & amortisation'
-    depreciation_row['account_name'] = 'Depreciation & amortisation'
-    finance_cost_row['account'] = 'Finance charges'
-    finance_cost_row['account_name'] = 'Finance charges'
-    
-    # Process depreciation and finance charges
-    for exp in expense:
-        if exp.get('indent') == 1.0:
-            # Handle depreciation
-            if 'depreciation & amortisation'.lower() in exp.get('account').lower():
-                # frappe.log_error("depreciation row", exp)
-                for key in exp.keys():
-                    if key not in ['account', 'account_name', 'indent']:
-                        try:
-                            depreciation_row[key] = float(exp.get(key) or 0)
-                        except (ValueError, TypeError):
-                            depreciation_row[key] = None
-            
-            # Handle finance charges
-            if 'finance charges'.lower() in exp.get('account').lower():
-                for key in exp.keys():
-                    if key not in ['account', 'account_name', 'indent']:
-                        try:
-                            finance_cost_row[key] = float(exp.get(key) or 0)
-                        except (ValueError, TypeError):
-                            finance_cost_row[key] = None
-    
-    filtered_data.append(empty_row)
-    # Update the operating expense subtract these two accounts value
-    months = ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec']
-    start_year = int(filters['from_fiscal_year'])
-    end_year = int(filters['to_fiscal_year'])
-    for month in months:
-        if end_year >= start_year:
-            key = f"{month}_{start_year}"
-            filtered_data[7][key] -= (float(finance_cost_row[key]) + float(depreciation_row[key]))
-
-        start_year += 1
-    
-    operating_expenses = filtered_data[7]
-
-    
-    # Calculate EBITDA
-    
-    row_main_keys = None
-    for exp1 in expense:
-        if exp1.get('indent') == 1.0:
-            row_main_keys = exp1
-            break
-
-    ebitda = {key: None for key in row_main_keys.keys()}
-    ebitda['account'] = 'EBITDA'
-    ebitda['account_name'] = 'EBITDA'
-    
-    for key in row_main_keys.keys():
-        if key not in ['account', 'account_name', 'indent']:
-            try:
-                value1 = gross_profit.get(key, 0)
-                value2 = operating_expenses.get(key, 0)
-                ebitda[key] = float(value1 or 0) - float(value2 or 0)
-            except (ValueError, TypeError):
-                ebitda[key] = None
-    
-    filtered_data.append(ebitda)
-    filtered_data.append(empty_row)
-    
-    # Add depreciation row
-    filtered_data.append(depreciation_row)
-    
-    # Calculate EBIT
-    ebit = {key: None for key in row_main_keys.keys()}
-    ebit['account'] = 'EBIT'
-    ebit['account_name'] = 'EBIT'
-    
-    for key in row_main_keys.keys():
-        if key not in ['account', 'account_name', 'indent']:
-            try:
-                ebitda_value = float(ebitda.get(key) or 0)
-                depreciation_value = float(depreciation_row.get(key) or 0)
-                ebit[key] = ebitda_value - depreciation_value
-            except (ValueError, TypeError):
-                ebit[key] = None
-    
-    filtered_data.append(ebit)
-    filtered_data.append(empty_row)
-    
-    # Add finance cost row
-    filtered_data.append(finance_cost_row)
-    
-    # Calculate Profit Before Tax
-    profit_before_tax_row = {key: None for key in row_main_keys.keys()}
-    profit_before_tax_row['account'] = 'Profit Before Tax'
-    profit_before_tax_row['account_name'] = 'Profit Before Tax'
-    
-    for key in row_main_keys.keys():
-        if key not in ['account', 'account_name', 'indent']:
-            try:
-                ebit_value = float(ebit.get(key) or 0)
-                finance_value = float(finance_cost_row.get(key) or 0)
-                profit_before_tax_row[key] = ebit_value - finance_value
-            except (ValueError, TypeError):
-                profit_before_tax_row[key] = None
-    
-    filtered_data.append(profit_before_tax_row)
-    filtered_data.append(empty_row)
-
-    # Update Operating expense number subtract deperication and the finance expense
-    # for key in filtered_data[7]:
-    #     if key not in ['account', 'account_name', 'indent'] and finance_cost_row[key] and depreciation_row[key]:
-    #         filtered_data[7][key] -= (float(finance_cost_row[key]) + float(depreciation_row[key]))
-   
-    
-
-    return filtered_data
-
-
-def get_report_summary(
-    period_list, periodicity, income, expense, net_profit_loss, currency, filters, consolidated=False
-):
-    net_income, net_expense, net_profit = 0.0, 0.0, 0.0
-
-    # from consolidated financial statement
-    if filters.get("accumulated_in_group_company"):
-        period_list = get_filtered_list_for_consolidated_report(filters, period_list)
-
-    if filters.accumulated_values:
-        # when 'accumulated_values' is enabled, periods have running balance.
-        # so, last period will have the net amount.
-        key = period_list[-1].key
-        if income:
-            net_income = income[-2].get(key)
-        if expense:
-            net_expense = expense[-2].get(key)
-        if net_profit_loss:
-            net_profit = net_profit_loss.get(key)
-    else:
-        for period in period_list:
-            key = period if consolidated else period.key
-            if income:
-                net_income += income[-2].get(key)
-            if expense:
-                net_expense += expense[-2].get(key)
-            if net_profit_loss:
-                net_profit += net_profit_loss.get(key)
-
-    if len(period_list) == 1 and periodicity == "Yearly":
-        profit_label = _("Profit This Year")
-        income_label = _("Total Income This Year")
-        expense_label = _("Total Expense This Year")
-    else:
-        profit_label = _("Net Profit")
-        income_label = _("Total Income")
-        expense_label = _("Total Expense")
-
-    return [
-        {"value": net_income, "label": income_label, "datatype": "Currency", "currency": currency},
-        {"type": "separator", "value": "-"},
-        {"value": net_expense, "label": expense_label, "datatype": "Currency", "currency": currency},
-        {"type": "separator", "value": "=", "color": "blue"},
-        {
-            "value": net_profit,
-            "indicator": "Green" if net_profit > 0 else "Red",
-            "label": profit_label,
-            "datatype": "Currency",
-            "currency": currency,
-        },
-    ], net_profit
-
-
-def get_net_profit_loss(income, expense, period_list, company, currency=None, consolidated=False):
-    total = 0
-    net_profit_loss = {
-        "account_name": _("Profit for the year"),
-        "account":  _("Profit for the year"),
-        "warn_if_negative": True,
-        "currency": currency or frappe.get_cached_value("Company", company, "default_currency"),
-    }
-
-    has_value = False
-
-    for period in period_list:
-        key = period if consolidated else period.key
-        total_income = flt(income[-2][key], 3) if income else 0
-        total_expense = flt(expense[-2][key], 3) if expense else 0
-
-        net_profit_loss[key] = total_income - total_expense
-
-        if net_profit_loss[key]:
-            has_value = True
-
-        total += flt(net_profit_loss[key])
-        net_profit_loss["total"] = total
-
-    if has_value:
-        return net_profit_loss
-
-
-def get_chart_data(filters, columns, income, expense, net_profit_loss, currency):
-    labels = [d.get("label") for d in columns[2:]]
-
-    income_data, expense_data, net_profit = [], [], []
-
-    for p in columns[2:]:
-        if income:
-            income_data.append(income[-2].get(p.get("fieldname")))
-        if expense:
-            expense_data.append(expense[-2].get(p.get("fieldname")))
-        if net_profit_loss:
-            net_profit.append(net_profit_loss.get(p.get("fieldname")))
-
-    datasets = []
-    if income_data:
-        datasets.append({"name": _("Income"), "values": income_data})
-    if expense_data:
-        datasets.append({"name": _("Expense"), "values": expense_data})
-    if net_profit:
-        datasets.append({"name": _("Net Profit/Loss"), "values": net_profit})
-
-    chart = {"data": {"labels": labels, "datasets": datasets}}
-
-    if not filters.accumulated_values:
-        chart["type"] = "bar"
-    else:
-        chart["type"] = "line"
-
-    chart["fieldtype"] = "Currency"
-    chart["options"] = "currency"
-    chart["currency"] = currency
-
-    return chart
-
-
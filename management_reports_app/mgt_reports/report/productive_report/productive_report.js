@@ -154,6 +154,8 @@ management_reports_app.productive_report = {
 	parent_field: "parent_account",
 	initial_depth: 3,
 	onload: function (report) {
+		management_reports_app.report_progress.setup(report);
+
 		// dropdown for links to other financial statements
 		erpnext.financial_statements.filters = get_filters();
 
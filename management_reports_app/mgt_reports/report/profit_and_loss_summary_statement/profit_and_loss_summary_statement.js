@@ -3,6 +3,10 @@
 
 
 frappe.query_reports["Profit and Loss Summary Statement"] = $.extend({}, erpnext.financial_statements, {
+    onload: function (report) {
+        erpnext.financial_statements.onload(report);
+        management_reports_app.report_progress.setup(report);
+    },
     formatter: function (value, row, column, data, default_formatter) {
         // First apply the default formatting
         value = default_formatter(value, row, column, data);
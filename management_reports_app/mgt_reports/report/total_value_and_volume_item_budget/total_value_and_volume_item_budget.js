@@ -57,6 +57,20 @@ function get_filters() {
 			default: frappe.defaults.get_user_default("Company"),
 			reqd: 1,
 		},
+		{
+			fieldname: "rollup_level",
+			label: __("Item Group Level"),
+			fieldtype: "Int",
+			default: 0,
+			description: __("Roll item groups up to this level of the tree (1 is the level below All Item Groups). 0 shows the item groups as sold."),
+		},
+		{
+			fieldname: "top_n",
+			label: __("Top Item Groups"),
+			fieldtype: "Int",
+			default: 0,
+			description: __("The rest are summed up as Others. 0 shows every item group."),
+		},
 	];
 
 	return filters;
@@ -1,159 +1,148 @@
 # Copyright (c) 2025, kunleadenuga and contributors
 # For license information, please see license.txt
 
+import heapq
+
+import numpy as np
 
 import frappe
 from frappe import _
-from frappe.utils import flt, formatdate, getdate
-from erpnext.controllers.trends import get_period_date_ranges, get_period_month_ranges
+from frappe.utils import cint, flt
+
+from management_reports_app.mgt_reports.instrumentation import profile_report, record_stage
+from management_reports_app.mgt_reports.item_sales import get_item_group_sales
+from management_reports_app.mgt_reports.item_variance import OTHERS, get_row_label
+from management_reports_app.mgt_reports.period_plan import PeriodPlan
+from management_reports_app.mgt_reports.result_cache import ITEM_SOURCES, cache_report_result
 
+@profile_report("Total Value And Volume Item Budget")
+@cache_report_result("Total Value And Volume Item Budget", ITEM_SOURCES)
 def execute(filters=None):
     if not filters:
         filters = {}
 
-    columns = get_columns(filters)
-    period_month_ranges = get_period_month_ranges(filters["period"], filters["from_fiscal_year"])
+    plan = PeriodPlan(filters)
+    columns = get_columns(plan)
+    record_stage("columns", columns=len(columns))
     
     # Get sales data grouped by item group
-    sales_data = get_sales_data(filters)
+    sales_data = get_sales_data(filters, plan)
+    record_stage("actuals", rows=len(sales_data))
     
     # Prepare final data
-    data = prepare_data(sales_data, filters, period_month_ranges)
+    data, totals = prepare_data(sales_data, plan, cint(filters.get("top_n")))
+    record_stage("rows", rows=len(data))
     
-    chart = get_chart_data(filters, columns, data)
-        
-
-    totals = ["Total"] + [sum(row[i] for row in data) for i in range(1, len(data[0]))]
+    chart = get_chart_data(plan, data)
 
-    # Append empty row (if needed)
-    empty_row = [None] * len(data[0])
-    data.append(empty_row)  # Optional spacing row
-    data.append(totals)
+    if data:
+        # Append empty row (if needed)
+        empty_row = [None] * len(totals)
+        data.append(empty_row)  # Optional spacing row
+        data.append(totals)
+    record_stage("chart_and_totals")
 
     return columns, data, None, chart
 
 
-def get_sales_data(filters):
-    """Get sales data from Sales Invoice Item grouped by item group"""
-    fiscal_year_dates = get_fiscal_year_dates(filters)
-    
-    return frappe.db.sql("""
-        SELECT 
-            si.item_group,
-            SUM(si.qty) as volume,
-            SUM(si.amount) as amount,
-            MONTHNAME(s.posting_date) as month_name,
-            YEAR(s.posting_date) as year
-        FROM 
-            `tabSales Invoice Item` si
-            INNER JOIN `tabSales Invoice` s ON s.name = si.parent
-        WHERE 
-            s.docstatus = 1
-            AND s.posting_date between %s and %s
-            AND s.company = %s
-        GROUP BY 
-            si.item_group, 
-            YEAR(s.posting_date),
-            MONTH(s.posting_date)
-    """, (fiscal_year_dates[0], fiscal_year_dates[1], filters.company), as_dict=1)
-
-
-def prepare_data(sales_data, filters, period_month_ranges):
-    """Prepare final data with period-specific contribution calculations"""
-    data = []
-    item_group_data = {}
-    period_totals = {}  # To store totals for each period
-    
-    # First pass: Calculate totals and organize data by item group
+def get_report_rows(filters):
+    """Columns, every row (no top N), the sort_values of the rows (its total value)
+    and the totals row, see report_rows"""
+    plan = PeriodPlan(filters)
+    data, totals = prepare_data(get_sales_data(filters, plan), plan)
+
+    return frappe._dict(
+        columns=get_columns(plan),
+        rows=data,
+        sort_values=[sum(row[2 : 3 * len(plan.periods) + 1 : 3]) for row in data],
+        totals=totals if data else None,
+    )
+
+
+def get_sales_data(filters, plan):
+    """Get sales data grouped by item group and month"""
+    return get_item_group_sales(
+        filters.company, plan.from_date, plan.to_date, cint(filters.get("rollup_level"))
+    )
+
+
+def get_sales_matrix(sales_data, plan):
+    """Item groups in order of appearance, and their volume and amount as dense
+    (item group x period) arrays, filled in one pass over the sales"""
+    item_groups = {}
+    rows, periods, volumes, amounts = [], [], [], []
     for entry in sales_data:
-        if entry.item_group not in item_group_data:
-            item_group_data[entry.item_group] = {
-                'periods': {},
-                'total_volume': 0,
-                'total_amount': 0
-            }
-        
-        period_key = (entry.year, entry.month_name)
-        if period_key not in item_group_data[entry.item_group]['periods']:
-            item_group_data[entry.item_group]['periods'][period_key] = {
-                'volume': 0,
-                'amount': 0
-            }
-        
-        item_group_data[entry.item_group]['periods'][period_key]['volume'] += flt(entry.volume)
-        item_group_data[entry.item_group]['periods'][period_key]['amount'] += flt(entry.amount)
-        item_group_data[entry.item_group]['total_volume'] += flt(entry.volume)
-        item_group_data[entry.item_group]['total_amount'] += flt(entry.amount)
-    
-    # Calculate period totals first
-    fiscal_years = get_fiscal_years(filters)
-    for year in fiscal_years:
-        year_start_date = frappe.db.get_value("Fiscal Year", year[0], "year_start_date")
-        current_year = getdate(year_start_date).year
-        
-        for period_months in period_month_ranges:
-            period_total = 0
-            for month in period_months:
-                for item_group in item_group_data:
-                    period_key = (current_year, month)
-                    if period_key in item_group_data[item_group]['periods']:
-                        period_total += flt(item_group_data[item_group]['periods'][period_key]['amount'])
-            
-            period_id = f"{year[0]}_{period_months[0]}_{period_months[-1]}"
-            period_totals[period_id] = period_total
-
-    # Calculate grand total for overall contribution
-    grand_total = sum(group_data['total_amount'] for group_data in item_group_data.values())
-    
-    # Second pass: Create rows with proper period distribution and contributions
-    for item_group in item_group_data:
-        row = [item_group]
-        group_total = 0
-        
-        for year in fiscal_years:
-            year_start_date = frappe.db.get_value("Fiscal Year", year[0], "year_start_date")
-            current_year = getdate(year_start_date).year
-            
-            for period_months in period_month_ranges:
-                period_volume = 0
-                period_amount = 0
-                
-                # Sum up the values for all months in the period
-                for month in period_months:
-                    period_key = (current_year, month)
-                    if period_key in item_group_data[item_group]['periods']:
-                        period_data = item_group_data[item_group]['periods'][period_key]
-                        period_volume += flt(period_data['volume'])
-                        period_amount += flt(period_data['amount'])
-                
-                # Calculate period-specific contribution
-                period_id = f"{year[0]}_{period_months[0]}_{period_months[-1]}"
-                period_contribution = (period_amount / period_totals[period_id] * 100) if period_totals[period_id] else 0
-                
-                row.extend([period_volume, period_amount, period_contribution])
-                group_total += period_amount
-        
-        if filters["period"] != "Yearly":
-            # Calculate total contribution based on grand total
-            total_contribution = (group_total / grand_total * 100) if grand_total else 0
-            row.extend([
-                item_group_data[item_group]['total_volume'],
-                group_total,
-                total_contribution
-            ])
-        
-        data.append(row)
-    
-    # Sort data by total amount in descending order
-    if filters["period"] != "Yearly":
-        data.sort(key=lambda x: x[-2], reverse=True)
-    else:
-        data.sort(key=lambda x: sum(x[i] for i in range(2, len(x), 3)), reverse=True)
-    
-    return data
+        row = item_groups.setdefault(entry.item_group, len(item_groups))
+        period = plan.month_periods.get((entry.year, entry.month_name))
+        if period is None:
+            continue
+
+        rows.append(row)
+        periods.append(period)
+        volumes.append(flt(entry.qty))
+        amounts.append(flt(entry.amount))
+
+    shape = (len(item_groups), len(plan.periods))
+    volume, amount = np.zeros(shape), np.zeros(shape)
+    # months of the same period add up
+    np.add.at(volume, (rows, periods), volumes)
+    np.add.at(amount, (rows, periods), amounts)
+
+    return list(item_groups), volume, amount
+
+
+def prepare_data(sales_data, plan, top_n=None):
+    """Rows per item group, by total amount descending, with volume, amount and
+    contribution to the period's amount per period and, unless yearly, in total; and the
+    totals row. With top_n, the other item groups are summed up in a last Others row"""
+    item_groups, volume, amount = get_top_item_groups(*get_sales_matrix(sales_data, plan), top_n)
 
+    period_totals = amount.sum(axis=0)
+    contribution = percentage_of(amount, period_totals)
 
-def get_columns(filters):
+    group_volumes, group_amounts = volume.sum(axis=1), amount.sum(axis=1)
+    grand_total = group_amounts.sum()
+    group_contribution = percentage_of(group_amounts, grand_total)
+
+    # (volume, amount, contribution) per period, then the totals
+    values = np.stack([volume, amount, contribution], axis=2).reshape(len(item_groups), 3 * len(plan.periods))
+    totals = np.stack([volume.sum(axis=0), period_totals, contribution.sum(axis=0)], axis=1).ravel()
+    if not plan.is_yearly:
+        values = np.column_stack([values, group_volumes, group_amounts, group_contribution])
+        totals = np.append(totals, [group_volumes.sum(), grand_total, group_contribution.sum()])
+
+    data = [[get_row_label(item_group)] + row.tolist() for item_group, row in zip(item_groups, values)]
+
+    return data, ["Total"] + totals.tolist()
+
+
+def get_top_item_groups(item_groups, volume, amount, top_n=None):
+    """Item groups and their volume and amount rows by total amount descending; beyond
+    top_n (picked with a bounded heap) the rest become one OTHERS row"""
+    group_amounts = amount.sum(axis=1)
+    if not top_n or len(item_groups) <= top_n:
+        order = np.argsort(-group_amounts, kind="stable")
+        return [item_groups[i] for i in order], volume[order], amount[order]
+
+    top = heapq.nlargest(top_n, range(len(item_groups)), key=group_amounts.__getitem__)
+    others = np.ones(len(item_groups), dtype=bool)
+    others[top] = False
+
+    return (
+        [item_groups[i] for i in top] + [OTHERS],
+        np.vstack([volume[top], volume[others].sum(axis=0)]),
+        np.vstack([amount[top], amount[others].sum(axis=0)]),
+    )
+
+
+def percentage_of(values, totals):
+    """values / totals in percent, 0 where the total is 0"""
+    out = np.zeros(np.broadcast(values, totals).shape)
+    np.divide(values * 100.0, totals, out=out, where=totals != 0)
+    return out
+
+
+def get_columns(plan):
     columns = [
         {
             "label": _("Item Group"),
@@ -164,42 +153,34 @@ def get_columns(filters):
         }
     ]
 
-    group_months = False if filters["period"] == "Monthly" else True
-    fiscal_year = get_fiscal_years(filters)
-
-    for year in fiscal_year:
-        for from_date, to_date in get_period_date_ranges(filters["period"], year[0]):
-            if filters["period"] == "Yearly":
-                period_label = str(year[0])
-            else:
-                if group_months:
-                    period_label = formatdate(from_date, format_string="MMM") + "-" + formatdate(to_date, format_string="MMM")
-                else:
-                    period_label = formatdate(from_date, format_string="MMM")
-                period_label += " " + str(year[0])
-            
-            columns.extend([
-                {
-                    "label": _("Volume") + " " + period_label,
-                    "fieldtype": "Float",
-                    "fieldname": f"volume_{period_label}".lower().replace("-", "_"),
-                    "width": 120
-                },
-                {
-                    "label": _("Value") + " " + period_label,
-                    "fieldtype": "Currency",
-                    "fieldname": f"value_{period_label}".lower().replace("-", "_"),
-                    "width": 120
-                },
-                {
-                    "label": _("% Contr. Value") + " " + period_label,
-                    "fieldtype": "Percent",
-                    "fieldname": f"contribution_{period_label}".lower().replace("-", "_"),
-                    "width": 120
-                }
-            ])
-
-    if filters["period"] != "Yearly":
+    for period in plan.periods:
+        if plan.is_yearly:
+            period_label = period.label
+        else:
+            period_label = period.label + " " + str(period.fiscal_year)
+        
+        columns.extend([
+            {
+                "label": _("Volume") + " " + period_label,
+                "fieldtype": "Float",
+                "fieldname": f"volume_{period_label}".lower().replace("-", "_"),
+                "width": 120
+            },
+            {
+                "label": _("Value") + " " + period_label,
+                "fieldtype": "Currency",
+                "fieldname": f"value_{period_label}".lower().replace("-", "_"),
+                "width": 120
+            },
+            {
+                "label": _("% Contr. Value") + " " + period_label,
+                "fieldtype": "Percent",
+                "fieldname": f"contribution_{period_label}".lower().replace("-", "_"),
+                "width": 120
+            }
+        ])
+
+    if not plan.is_yearly:
         columns.extend([
             {
                 "label": _("Total Volume"),
@@ -223,44 +204,11 @@ def get_columns(filters):
 
     return columns
 
-def get_fiscal_year_dates(filters):
-    start_date = frappe.db.get_value("Fiscal Year", filters.from_fiscal_year, "year_start_date")
-    end_date = frappe.db.get_value("Fiscal Year", filters.to_fiscal_year, "year_end_date")
-    return start_date, end_date
-
-def get_fiscal_years(filters):
-    return frappe.db.sql("""
-        select name
-        from `tabFiscal Year`
-        where name between %(from_fiscal_year)s and %(to_fiscal_year)s
-    """, {
-        "from_fiscal_year": filters["from_fiscal_year"],
-        "to_fiscal_year": filters["to_fiscal_year"]
-    })
-
-def get_chart_data(filters, columns, data):
+def get_chart_data(plan, data):
     if not data:
         return None
 
-    labels = []
-    fiscal_year = get_fiscal_years(filters)
-    group_months = False if filters["period"] == "Monthly" else True
-
-    for year in fiscal_year:
-        for from_date, to_date in get_period_date_ranges(filters["period"], year[0]):
-            if filters["period"] == "Yearly":
-                labels.append(str(year[0]))
-            else:
-                if group_months:
-                    label = (
-                        formatdate(from_date, format_string="MMM")
-                        + "-"
-                        + formatdate(to_date, format_string="MMM")
-                    )
-                    labels.append(label)
-                else:
-                    label = formatdate(from_date, format_string="MMM")
-                    labels.append(label)
+    labels = [period.label for period in plan.periods]
 
     volumes = []
     values = []
@@ -0,0 +1,257 @@
+# Copyright (c) 2025, kunleadenuga and contributors
+# For license information, please see license.txt
+
+"""Synchronous or prepared execution of the MGT reports, decided per run.
+
+frappe.desk.query_report.run is overridden (see hooks.override_whitelisted_methods) so
+that, before one of REPORTS executes, its cost is estimated from the filters: report
+periods x lines, plus the rows the database expects to read for it (EXPLAIN of the GL
+Entry / Sales Invoice Item scan, or of the MGT month buckets when those serve the run).
+Above the threshold, and without a cached result (see result_cache), the run becomes a
+Prepared Report generated on the long queue; cheap runs and all other reports go through
+the standard run. A run that finds the same result being computed by another one waits
+a few seconds for it, then becomes a Prepared Report as well; the job waits for that run
+instead of computing the result again.
+
+The threshold can be set per site with
+
+    bench --site <site> set-config mgt_reports_prepared_report_cost 500000
+"""
+
+import math
+
+import frappe
+from frappe import _
+from frappe.core.doctype.prepared_report.prepared_report import (
+    make_prepared_report,
+    process_filters_for_prepared_report,
+)
+from frappe.desk import query_report
+from frappe.utils import add_months, cint, flt, get_first_day, get_last_day, getdate, sbool
+
+from management_reports_app.mgt_reports.account_balance import can_use_account_balances
+from management_reports_app.mgt_reports.gl_aggregation import get_pl_accounts
+from management_reports_app.mgt_reports.period_plan import PERIOD_MONTHS
+from management_reports_app.mgt_reports.result_cache import (
+    GL_SOURCES,
+    ITEM_SOURCES,
+    ResultPending,
+    get_data_watermark,
+    has_cached_result,
+)
+
+DEFAULT_PREPARED_REPORT_COST = 500000
+
+
+@frappe.whitelist()
+def run(
+    report_name,
+    filters=None,
+    user=None,
+    ignore_prepared_report=False,
+    custom_columns=None,
+    is_tree=False,
+    parent_field=None,
+    are_default_filters=True,
+):
+    kwargs = dict(
+        filters=filters,
+        user=user,
+        ignore_prepared_report=ignore_prepared_report,
+        custom_columns=custom_columns,
+        is_tree=is_tree,
+        parent_field=parent_field,
+        are_default_filters=are_default_filters,
+    )
+    if report_name not in REPORTS or sbool(ignore_prepared_report) or custom_columns:
+        return query_report.run(report_name, **kwargs)
+
+    parsed_filters = frappe._dict(frappe.parse_json(filters) or {})
+    # set by the report view to show a Prepared Report it was given
+    prepared_report_name = parsed_filters.pop("prepared_report_name", None)
+    if prepared_report_name:
+        report = get_permitted_report(report_name)
+        return query_report.get_prepared_report_result(
+            report, parsed_filters, prepared_report_name, user or frappe.session.user
+        )
+
+    estimator, sources = REPORTS[report_name]
+    if (
+        parsed_filters.company
+        and estimator(parsed_filters) > get_prepared_report_cost()
+        # a cached result is cheap whatever the filters
+        and not has_cached_result(report_name, sources, parsed_filters)
+    ):
+        return run_prepared(report_name, parsed_filters, sources, user or frappe.session.user)
+
+    # see result_cache.run_single_flight
+    frappe.flags.mgt_reports_short_wait = True
+    try:
+        return query_report.run(report_name, **kwargs)
+    except ResultPending:
+        return run_prepared(report_name, parsed_filters, sources, user or frappe.session.user)
+    finally:
+        frappe.flags.mgt_reports_short_wait = False
+
+
+def run_prepared(report_name, filters, sources, user):
+    """Result of a Prepared Report for the filters, queuing one unless a run started after
+    the last change of the report's data exists"""
+    report = get_permitted_report(report_name)
+    conditions = {
+        "report_name": report_name,
+        "filters": process_filters_for_prepared_report(filters),
+        "owner": user,
+        "status": ["in", ["Queued", "Started", "Completed"]],
+    }
+    changes = [d[0] for d in get_data_watermark(sources, filters.company) if d[0]]
+    if changes:
+        conditions["creation"] = [">", max(changes)]
+
+    name = frappe.db.get_value("Prepared Report", conditions, "name", order_by="creation desc")
+    if not name:
+        name = make_prepared_report(report_name, filters)["name"]
+        # reports are run over GET, which is not committed; the job is enqueued on commit
+        frappe.db.commit()
+
+    doc = frappe.get_doc("Prepared Report", name)
+    if doc.status == "Completed":
+        return query_report.get_prepared_report_result(report, filters, name, user)
+
+    # still running: the report view shows its status and reloads when it completes
+    return {"prepared_report": True, "doc": doc}
+
+
+def get_permitted_report(report_name):
+    report = query_report.get_report_doc(report_name)
+    if not frappe.has_permission(report.ref_doctype, "report"):
+        frappe.msgprint(
+            _("Must have report permission to access this report."),
+            raise_exception=True,
+        )
+
+    return report
+
+
+def get_prepared_report_cost():
+    return cint(frappe.conf.get("mgt_reports_prepared_report_cost")) or DEFAULT_PREPARED_REPORT_COST
+
+
+def estimate_gl_report_cost(filters):
+    from_date, to_date = get_report_dates(filters)
+    if not from_date or not to_date:
+        return 0
+
+    periods = math.ceil(get_months(from_date, to_date) / PERIOD_MONTHS.get(filters.periodicity, 1))
+    cells = periods * len(get_pl_accounts(filters.company))
+
+    values = {"company": filters.company, "from_date": from_date, "to_date": to_date}
+    if can_use_account_balances(filters) and is_month_aligned(from_date, to_date):
+        rows = explain_rows(
+            """
+            select account from `tabMGT Monthly Account Balance`
+            where company = %(company)s
+                and posting_year between year(%(from_date)s) and year(%(to_date)s)
+        """,
+            values,
+        )
+    else:
+        rows = explain_rows(
+            """
+            select account from `tabGL Entry`
+            where company = %(company)s
+                and posting_date between %(from_date)s and %(to_date)s
+                and is_cancelled = 0
+        """,
+            values,
+        )
+
+    return cells + rows
+
+
+def estimate_item_report_cost(filters):
+    from_date, to_date = get_fiscal_year_dates(filters.from_fiscal_year, filters.to_fiscal_year)
+    if not from_date or not to_date:
+        return 0
+
+    periods = math.ceil(get_months(from_date, to_date) / PERIOD_MONTHS.get(filters.period, 1))
+    cells = periods * frappe.db.count("Item Group")
+
+    values = {"company": filters.company, "from_date": from_date, "to_date": to_date}
+    if is_month_aligned(from_date, to_date):
+        # see item_sales.get_item_group_sales
+        rows = explain_rows(
+            """
+            select item_group from `tabMGT Item Group Monthly Sales`
+            where company = %(company)s
+                and posting_year between year(%(from_date)s) and year(%(to_date)s)
+        """,
+            values,
+        )
+    else:
+        rows = explain_rows(
+            """
+            select si.item_group
+            from `tabSales Invoice Item` si
+                inner join `tabSales Invoice` s on s.name = si.parent
+            where s.docstatus = 1
+                and s.company = %(company)s
+                and s.posting_date between %(from_date)s and %(to_date)s
+        """,
+            values,
+        )
+
+    return cells + rows
+
+
+def explain_rows(query, values):
+    """Rows the optimizer expects to examine: the product of the rows of each table
+    of the plan"""
+    rows = 1
+    for d in frappe.db.sql(f"explain {query}", values, as_dict=1):
+        rows *= max(flt(d.get("rows")), 1)
+
+    return rows
+
+
+def get_report_dates(filters):
+    if filters.as_of_date:
+        # Monthly Current month Vs Last month: the month of the date and the one before
+        return get_first_day(add_months(filters.as_of_date, -1)), get_last_day(filters.as_of_date)
+
+    if filters.filter_based_on == "Date Range":
+        return filters.period_start_date, filters.period_end_date
+
+    return get_fiscal_year_dates(filters.from_fiscal_year, filters.to_fiscal_year)
+
+
+def get_fiscal_year_dates(from_fiscal_year, to_fiscal_year):
+    if not from_fiscal_year or not to_fiscal_year:
+        return None, None
+
+    return (
+        frappe.get_cached_value("Fiscal Year", from_fiscal_year, "year_start_date"),
+        frappe.get_cached_value("Fiscal Year", to_fiscal_year, "year_end_date"),
+    )
+
+
+def get_months(from_date, to_date):
+    from_date, to_date = getdate(from_date), getdate(to_date)
+    return max((to_date.year - from_date.year) * 12 + to_date.month - from_date.month + 1, 1)
+
+
+def is_month_aligned(from_date, to_date):
+    return getdate(from_date).day == 1 and getdate(to_date) == get_last_day(to_date)
+
+
+# report -> (cost estimator, doctypes the result comes from)
+REPORTS = {
+    "Monthly Actual Vs Budget": (estimate_gl_report_cost, GL_SOURCES),
+    "Monthly Actual Vs Budget (Other Revenue)": (estimate_gl_report_cost, GL_SOURCES),
+    "Monthly Current month Vs Last month": (estimate_gl_report_cost, GL_SOURCES),
+    "Productive Report": (estimate_gl_report_cost, GL_SOURCES),
+    "Profit and Loss Summary Statement": (estimate_gl_report_cost, GL_SOURCES),
+    "Item Budget Variance Report": (estimate_item_report_cost, ITEM_SOURCES),
+    "Item Qty Budget Based Report": (estimate_item_report_cost, ITEM_SOURCES),
+    "Total Value And Volume Item Budget": (estimate_item_report_cost, ITEM_SOURCES),
+}
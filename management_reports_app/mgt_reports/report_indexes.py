@@ -0,0 +1,64 @@
+# Copyright (c) 2025, kunleadenuga and contributors
+# For license information, please see license.txt
+
+"""Indexes for the report queries on tables of other apps.
+
+Each one matches one access path, with the equality columns first and the range column
+last, followed by the columns the query only reads so the index covers it (InnoDB keeps
+the primary key, name, in every secondary index):
+
+- Sales Invoice by company, docstatus and posting_date, joined on name
+  (item_sales.get_item_group_sales_from_invoices, rebuild_item_group_sales)
+- Sales Invoice Item by parent, grouped by item_code, summing qty and amount
+  (item_variance.get_item_code_page, get_item_code_totals)
+- Volume Budget by company, budget_against, docstatus and a fiscal_year range, reading
+  monthly_distribution (item_variance.get_budget_and_sales)
+- Budget Item by parent, grouped by item_group, summing budget_amount and budget_qty
+
+They are added by the add_report_indexes patch; see index_benchmark for timings.
+
+There is no index for the item group scan of Sales Invoice Item: whole months are read
+from the MGT month buckets (see item_sales), and the scan of a partial month is served by
+the parent index, so every invoice line would pay for an index the reports barely use.
+DROPPED_INDEXES are removed by the drop_report_indexes patch.
+"""
+
+import frappe
+
+# doctype -> [(index name, fields)]
+REPORT_INDEXES = {
+    "Sales Invoice": [("mgt_company_docstatus_posting_date", ["company", "docstatus", "posting_date"])],
+    "Sales Invoice Item": [("mgt_parent_item_code_qty_amount", ["parent", "item_code", "qty", "amount"])],
+    "Volume Budget": [
+        (
+            "mgt_company_budget_against_fiscal_year",
+            ["company", "budget_against", "docstatus", "fiscal_year", "monthly_distribution"],
+        )
+    ],
+    "Budget Item": [
+        ("mgt_parent_item_group_budget", ["parent", "item_group", "budget_amount", "budget_qty"])
+    ],
+}
+
+
+def add_report_indexes():
+    for doctype, indexes in REPORT_INDEXES.items():
+        # Volume Budget and Budget Item come from the budgeting app, which may not be installed
+        if not frappe.db.table_exists(doctype):
+            continue
+
+        for index_name, fields in indexes:
+            frappe.db.add_index(doctype, fields, index_name=index_name)
+
+
+# doctype -> [index name] of indexes earlier versions added
+DROPPED_INDEXES = {
+    "Sales Invoice Item": ["mgt_parent_item_group_qty_amount"],
+}
+
+
+def drop_report_indexes():
+    for doctype, index_names in DROPPED_INDEXES.items():
+        for index_name in index_names:
+            if frappe.db.has_index(f"tab{doctype}", index_name):
+                frappe.db.sql_ddl(f"alter table `tab{doctype}` drop index `{index_name}`")
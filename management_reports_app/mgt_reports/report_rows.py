@@ -0,0 +1,171 @@
+# Copyright (c) 2025, kunleadenuga and contributors
+# For license information, please see license.txt
+
+"""Windows of rows of the item group reports.
+
+Deep item group breakdowns are too many rows to send in one report response. get_rows
+returns them a page at a time, sorted by total descending, by position (start) or after
+the last row of the previous page (keyset). The full sorted result is computed once
+per session and filters and kept in the result cache (see result_cache), under the same
+key as the report's result, so a new posting or Item Group change starts over and
+scrolling only slices the stored rows.
+
+Item codes (the group_by filter of the item variance reports) are too many to sort and
+keep whole: each page of them is ranked and cut in the database, and only the totals row
+and the number of rows are kept for the session.
+"""
+
+import bisect
+from functools import partial
+
+import frappe
+from frappe import _
+from frappe.desk.query_report import get_report_doc
+from frappe.utils import cint
+
+from management_reports_app.mgt_reports.item_variance import (
+    AMOUNT,
+    ITEM_CODE,
+    QTY,
+    get_columns,
+    get_item_code_page,
+    get_item_code_totals,
+    get_item_variance_rows,
+    get_variance_rows,
+)
+from management_reports_app.mgt_reports.period_plan import PeriodPlan
+from management_reports_app.mgt_reports.report.total_value_and_volume_item_budget.total_value_and_volume_item_budget import (
+    get_report_rows,
+)
+from management_reports_app.mgt_reports.result_cache import ITEM_SOURCES, get_result_cache_key
+
+ROWS_CACHE_TTL = 30 * 60
+DEFAULT_PAGE_LENGTH = 100
+MAX_PAGE_LENGTH = 1000
+
+# report -> function of the filters returning its columns, rows, sort_values and totals
+ROW_SOURCES = {
+    "Item Budget Variance Report": partial(get_item_variance_rows, measure=AMOUNT),
+    "Item Qty Budget Based Report": partial(get_item_variance_rows, measure=QTY),
+    "Total Value And Volume Item Budget": get_report_rows,
+}
+
+# reports that can show item codes -> the measure their rows are sorted by
+ITEM_CODE_MEASURES = {
+    "Item Budget Variance Report": AMOUNT,
+    "Item Qty Budget Based Report": QTY,
+}
+
+
+@frappe.whitelist()
+def get_rows(report_name, filters=None, start=0, page_length=DEFAULT_PAGE_LENGTH, after=None):
+    """Up to page_length rows of the report from position start or, when given, after the
+    row whose key (see next) is `after`; with the columns, the totals row, the number of
+    rows and the key to pass for the next page (None on the last one)"""
+    if report_name not in ROW_SOURCES:
+        frappe.throw(_("Report {0} cannot be read by pages").format(report_name))
+
+    report = get_report_doc(report_name)
+    if not frappe.has_permission(report.ref_doctype, "report"):
+        frappe.throw(_("Must have report permission to access this report."), frappe.PermissionError)
+
+    filters = frappe._dict(frappe.parse_json(filters) or {})
+    # paging takes the place of the top N mode
+    filters.top_n = 0
+    page_length = min(max(cint(page_length), 1), MAX_PAGE_LENGTH)
+    if filters.group_by == ITEM_CODE and report_name in ITEM_CODE_MEASURES:
+        return get_item_code_rows(report_name, filters, start, page_length, after)
+
+    result = get_sorted_rows(report_name, filters)
+
+    start = cint(start)
+    if after:
+        value, item_group = frappe.parse_json(after)
+        start = bisect.bisect_right(result.sort_keys, get_sort_key(value, item_group))
+
+    start = max(start, 0)
+    end = start + page_length
+    rows = result.rows[start:end]
+
+    return {
+        "columns": result.columns,
+        "rows": rows,
+        "totals": result.totals,
+        "start": start,
+        "total_count": len(result.rows),
+        "next": result.next_keys[end - 1] if rows and end < len(result.rows) else None,
+    }
+
+
+def get_sorted_rows(report_name, filters):
+    cache_key = get_rows_cache_key(report_name, filters)
+    result = frappe.cache().get_value(cache_key, expires=True)
+    if result is None:
+        result = ROW_SOURCES[report_name](filters)
+        order = sorted(
+            range(len(result.rows)), key=lambda i: get_sort_key(result.sort_values[i], result.rows[i][0])
+        )
+
+        result.rows = [result.rows[i] for i in order]
+        # what the client passes back as `after`
+        result.next_keys = [[result.sort_values[i], result.rows[n][0]] for n, i in enumerate(order)]
+        result.sort_keys = [get_sort_key(*key) for key in result.next_keys]
+        del result["sort_values"]
+        frappe.cache().set_value(cache_key, result, expires_in_sec=ROWS_CACHE_TTL)
+
+    return result
+
+
+def get_item_code_rows(report_name, filters, start, page_length, after):
+    """get_rows of an item variance report by item code, one page read at a time"""
+    measure = ITEM_CODE_MEASURES[report_name]
+    plan = PeriodPlan(filters)
+    summary = get_item_code_summary(report_name, filters, plan, measure)
+
+    start = max(cint(start), 0)
+    ranked, variance = [], {}
+    if plan.fiscal_years:
+        # one more than the page, to tell whether there is a next one
+        page = get_item_code_page(
+            filters, plan, measure, page_length + 1, start, frappe.parse_json(after) if after else None
+        )
+        ranked, variance = page.ranked, page.variance
+
+    page_variance = {item_code: variance[item_code] for _total, item_code in ranked[:page_length]}
+    rows = get_variance_rows(page_variance, measure, plan)
+    return {
+        "columns": get_columns(plan, ITEM_CODE),
+        "rows": rows,
+        "totals": summary.totals,
+        # the position of a key is not known without ranking what comes before it
+        "start": None if after else start,
+        "total_count": summary.count,
+        "next": list(ranked[page_length - 1]) if len(ranked) > page_length else None,
+    }
+
+
+def get_item_code_summary(report_name, filters, plan, measure):
+    """Number of item codes and the totals row, cached for the session"""
+    cache_key = get_rows_cache_key(report_name, filters)
+    summary = frappe.cache().get_value(cache_key, expires=True)
+    if summary is None:
+        summary = frappe._dict(count=0, totals=None)
+        if plan.fiscal_years:
+            totals = get_item_code_totals(filters, plan, count=True)
+            summary.count = totals.count
+            if totals.count:
+                summary.totals = get_variance_rows({_("Total"): totals}, measure, plan)[0]
+
+        frappe.cache().set_value(cache_key, summary, expires_in_sec=ROWS_CACHE_TTL)
+
+    return summary
+
+
+def get_sort_key(value, item_group):
+    """Total descending, then item group, so that equal totals still have one order"""
+    return (-(value or 0), item_group or "")
+
+
+def get_rows_cache_key(report_name, filters):
+    # below the report's result key, so clear_result_cache drops it as well
+    return f"{get_result_cache_key(report_name, ITEM_SOURCES, filters)}|rows|{frappe.session.sid}"
@@ -0,0 +1,182 @@
+# Copyright (c) 2025, kunleadenuga and contributors
+# For license information, please see license.txt
+
+"""Redis cache of report results.
+
+A result is stored under (report, normalized filters, permission fingerprint, data
+watermark). The watermark is the latest modified of the doctypes a report reads, for the
+company: GL_SOURCES or ITEM_SOURCES, where the MGT month buckets stand in for GL Entry
+and Sales Invoice (their submit and cancel hooks touch a bucket for every posting). It
+is probed with one query on every run, so a new posting changes the key and the next run
+recomputes; entries of older watermarks are never read again and expire after
+RESULT_CACHE_TTL.
+
+Identical runs arriving together are coalesced: the first takes a short redis lock on the
+key and computes, the others poll for its result instead of computing it again. A report
+view request only polls for a few seconds, then gets a prepared report (see
+report_execution) rather than holding its web worker.
+"""
+
+import hashlib
+import json
+import time
+from functools import wraps
+
+import frappe
+from frappe.core.doctype.user_permission.user_permission import get_user_permissions
+
+from management_reports_app.mgt_reports.instrumentation import record_stage
+
+RESULT_CACHE_KEY = "mgt_reports_result"
+RESULT_CACHE_TTL = 24 * 60 * 60
+
+# how long a run holds the lock of its key, and others wait for it, before they compute
+# on their own
+SINGLE_FLIGHT_TIMEOUT = 120
+# how long a run with frappe.flags.mgt_reports_short_wait set waits before ResultPending
+SINGLE_FLIGHT_SHORT_WAIT = 3
+SINGLE_FLIGHT_POLL_INTERVAL = 0.25
+
+GL_SOURCES = ("MGT Monthly Account Balance", "Budget", "Account")
+ITEM_SOURCES = ("MGT Item Group Monthly Sales", "Volume Budget")
+
+
+def cache_report_result(report_name, sources, get_key_filters=None):
+    """Decorator for a report's execute, below profile_report; sources are the doctypes
+    (with a company field) its figures come from. get_key_filters, if given, returns the
+    filters to key the result on, with the defaults execute fills in for missing ones"""
+
+    def decorator(execute):
+        @wraps(execute)
+        def wrapper(filters=None):
+            filters = frappe._dict(filters or {})
+            if not filters.company:
+                return execute(filters)
+
+            # probed before running, so postings made meanwhile invalidate the result
+            cache_key = get_result_cache_key(
+                report_name, sources, get_key_filters(filters) if get_key_filters else filters
+            )
+            result = get_cached_result(cache_key)
+            if result is not None:
+                record_stage("cache_hit")
+                return result
+
+            return run_single_flight(cache_key, lambda: execute(filters))
+
+        return wrapper
+
+    return decorator
+
+
+class ResultPending(Exception):
+    """Another run is still computing the result a short wait was for"""
+
+
+def run_single_flight(cache_key, compute):
+    """Result of compute, computed by one of the concurrent runs for the key. With
+    frappe.flags.mgt_reports_short_wait set, ResultPending is raised when the run holding
+    the key has not finished within SINGLE_FLIGHT_SHORT_WAIT"""
+    lock = SingleFlightLock(cache_key)
+    short_wait = frappe.flags.mgt_reports_short_wait
+    deadline = time.monotonic() + (SINGLE_FLIGHT_SHORT_WAIT if short_wait else SINGLE_FLIGHT_TIMEOUT)
+    while not lock.acquire():
+        if time.monotonic() > deadline:
+            if short_wait:
+                raise ResultPending(cache_key)
+
+            # the run holding the lock is stuck, do not queue behind it any longer
+            return compute_result(cache_key, compute)
+
+        time.sleep(SINGLE_FLIGHT_POLL_INTERVAL)
+        result = get_cached_result(cache_key)
+        if result is not None:
+            record_stage("coalesced")
+            return result
+
+    try:
+        # the previous holder may have stored it just before we got the lock
+        result = get_cached_result(cache_key)
+        if result is None:
+            result = compute_result(cache_key, compute)
+        return result
+    finally:
+        lock.release()
+
+
+def compute_result(cache_key, compute):
+    result = compute()
+    frappe.cache().set_value(cache_key, result, expires_in_sec=RESULT_CACHE_TTL)
+    return result
+
+
+def has_cached_result(report_name, sources, filters):
+    return get_cached_result(get_result_cache_key(report_name, sources, filters)) is not None
+
+
+def get_cached_result(cache_key):
+    # expires=True reads redis every time instead of the request local copy, which
+    # would keep returning the miss while waiting
+    return frappe.cache().get_value(cache_key, expires=True)
+
+
+class SingleFlightLock:
+    def __init__(self, cache_key):
+        self.name = frappe.cache().make_key(f"{cache_key}|lock")
+        self.token = frappe.generate_hash(length=16)
+
+    def acquire(self):
+        return bool(frappe.cache().set(self.name, self.token, nx=True, ex=SINGLE_FLIGHT_TIMEOUT))
+
+    def release(self):
+        # only our own lock, it may have expired and been taken by another run
+        if frappe.cache().get(self.name) == self.token.encode():
+            frappe.cache().delete(self.name)
+
+
+def get_result_cache_key(report_name, sources, filters):
+    key = json.dumps(
+        [
+            report_name,
+            normalize_filters(filters),
+            get_permission_fingerprint(),
+            get_data_watermark(sources, filters.company),
+        ],
+        sort_keys=True,
+        default=str,
+    )
+    return f"{RESULT_CACHE_KEY}|{hashlib.sha1(key.encode()).hexdigest()}"
+
+
+def normalize_filters(filters):
+    """Filters without empty values, lists sorted, so equal selections share an entry"""
+    normalized = {}
+    for fieldname, value in filters.items():
+        if value in (None, "", [], 0):
+            continue
+        normalized[fieldname] = sorted(value, key=str) if isinstance(value, (list, tuple)) else value
+
+    return normalized
+
+
+def get_permission_fingerprint(user=None):
+    """Roles and User Permissions of the user; users seeing the same data share entries"""
+    user = user or frappe.session.user
+    return hashlib.sha1(
+        json.dumps(
+            [sorted(frappe.get_roles(user)), get_user_permissions(user)], sort_keys=True, default=str
+        ).encode()
+    ).hexdigest()
+
+
+def get_data_watermark(sources, company):
+    return frappe.db.sql(
+        "\nunion all\n".join(
+            f"select max(modified) from `tab{doctype}` where company = %(company)s" for doctype in sources
+        ),
+        {"company": company},
+    )
+
+
+def clear_result_cache(doc=None, method=None, *args):
+    frappe.cache().delete_keys(RESULT_CACHE_KEY)
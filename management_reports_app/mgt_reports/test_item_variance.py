@@ -0,0 +1,59 @@
+# Copyright (c) 2025, kunleadenuga and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from management_reports_app.mgt_reports.item_variance import (
+    AMOUNT,
+    OTHERS,
+    QTY,
+    get_top_item_groups,
+    get_variance_rows,
+)
+
+
+def get_group(budget_amount, amount, qty=(0, 0)):
+    return {"budget_amount": list(budget_amount), "budget_qty": [0, 0], AMOUNT: list(amount), QTY: list(qty)}
+
+
+class TestItemVariance(FrappeTestCase):
+    def setUp(self):
+        self.variance = {
+            "Products": get_group((100, 100), (50, 50), (5, 5)),
+            "Services": get_group((0, 0), (150, 100), (1, 1)),
+            "Spares": get_group((40, 0), (10, 10), (2, 0)),
+            "Consumables": get_group((0, 0), (20, 0), (4, 4)),
+        }
+
+    def test_top_item_groups(self):
+        top = get_top_item_groups(self.variance, 2)
+
+        # by the larger of budget and actual amount, the rest summed up
+        self.assertEqual(list(top), ["Services", "Products", OTHERS])
+        self.assertEqual(top[OTHERS], get_group((40, 0), (30, 10), (6, 4)))
+
+    def test_item_group_named_others(self):
+        self.variance["Others"] = self.variance.pop("Spares")
+        top = get_top_item_groups(self.variance, 3)
+
+        self.assertEqual(top["Others"], get_group((40, 0), (10, 10), (2, 0)))
+        self.assertEqual(top[OTHERS], get_group((0, 0), (20, 0), (4, 4)))
+
+        plan = frappe._dict(periods=[frappe._dict(), frappe._dict()], is_yearly=True)
+        rows = get_variance_rows(top, AMOUNT, plan)
+        self.assertEqual([row[0] for row in rows], ["Services", "Products", "Others", "Others"])
+
+    def test_all_item_groups(self):
+        self.assertIs(get_top_item_groups(self.variance, 0), self.variance)
+        self.assertIs(get_top_item_groups(self.variance, 4), self.variance)
+
+    def test_variance_rows(self):
+        plan = frappe._dict(periods=[frappe._dict(), frappe._dict()], is_yearly=False)
+        rows = get_variance_rows({"Products": self.variance["Products"]}, AMOUNT, plan)
+
+        # budget, actual and % achieved per period, then in total
+        self.assertEqual(rows, [["Products", 100, 50, 50.0, 100, 50, 50.0, 200, 100, 50.0]])
+
+        rows = get_variance_rows({"Services": self.variance["Services"]}, QTY, plan)
+        self.assertEqual(rows, [["Services", 0, 1, 0, 0, 1, 0, 0, 2, 0]])
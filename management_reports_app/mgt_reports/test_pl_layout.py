@@ -0,0 +1,219 @@
+# Copyright (c) 2025, kunleadenuga and contributors
+# For license information, please see license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from management_reports_app.mgt_reports.pl_classification import (
+    ADMINISTRATIVE_EXPENSES,
+    COST_OF_SALES,
+    DEPRECIATION,
+    EMPLOYEE_BENEFITS,
+    FINANCE_COST,
+    INCOME,
+    OPERATING_EXPENSES,
+    OTHER_EXPENSES,
+    OTHER_INCOME,
+    REVENUE,
+)
+from management_reports_app.mgt_reports.pl_cube import (
+    ACHIEVEMENT,
+    ACTUAL,
+    AMOUNT,
+    BUDGET,
+    RATIO,
+    SPACER,
+    VARIANCE,
+    PLCube,
+)
+from management_reports_app.mgt_reports.pl_layout import (
+    MONTHLY_ACTUAL_VS_BUDGET,
+    PRODUCTIVE,
+    compile_layout,
+    evaluate_layout,
+)
+
+COMPANY = "_Test MGT Company"
+
+# account -> (P&L line, lft)
+CHART = {
+    "Income - TM": (INCOME, 1),
+    "Sales - TM": (REVENUE, 2),
+    "Non Line Income - TM": (OTHER_INCOME, 3),
+    "Cost of Goods Sold - TM": (COST_OF_SALES, 10),
+    "Operating Expenses - TM": (OPERATING_EXPENSES, 20),
+    "Employees Benefit Expenses - TM": (EMPLOYEE_BENEFITS, 21),
+    "Administrative Expenses - TM": (ADMINISTRATIVE_EXPENSES, 22),
+    "Depreciation & Amortisation - TM": (DEPRECIATION, 23),
+    "Finance Charges - TM": (FINANCE_COST, 24),
+    "Other Expenses - TM": (OTHER_EXPENSES, 30),
+}
+
+# account -> (January, February), group accounts with the balance of their children
+ACTUALS = {
+    "Income - TM": (1100, 1650),
+    "Sales - TM": (1000, 1500),
+    "Non Line Income - TM": (100, 150),
+    "Cost of Goods Sold - TM": (400, 600),
+    "Operating Expenses - TM": (350, 400),
+    "Employees Benefit Expenses - TM": (200, 200),
+    "Administrative Expenses - TM": (50, 100),
+    "Depreciation & Amortisation - TM": (60, 60),
+    "Finance Charges - TM": (40, 40),
+    "Other Expenses - TM": (10, 20),
+}
+
+BUDGETS = {"2025": {"Sales - TM": {"jan": 900, "feb": 1500}, "Cost of Goods Sold - TM": {"jan": 500}}}
+
+PERIODS = [
+    frappe._dict(key="jan_2025", from_date="2025-01-01", to_date="2025-01-31", to_date_fiscal_year="2025"),
+    frappe._dict(key="feb_2025", from_date="2025-02-01", to_date="2025-02-28", to_date_fiscal_year="2025"),
+]
+
+
+def get_test_account_tree(company):
+    return {
+        account: frappe._dict(name=account, account_name=account.rsplit(" - ", 1)[0], account_number=None, lft=lft)
+        for account, (pl_line, lft) in CHART.items()
+    }
+
+
+def get_test_pl_line_accounts(company):
+    line_accounts = {}
+    for account, (pl_line, lft) in CHART.items():
+        line_accounts.setdefault(pl_line, []).append(account)
+
+    return line_accounts
+
+
+def get_test_rows():
+    return [
+        {"account": account, "jan_2025": january, "feb_2025": february}
+        for account, (january, february) in ACTUALS.items()
+    ]
+
+
+@patch("management_reports_app.mgt_reports.pl_layout.get_pl_line_accounts", get_test_pl_line_accounts)
+@patch("management_reports_app.mgt_reports.pl_layout.get_account_tree", get_test_account_tree)
+class TestPLLayout(FrappeTestCase):
+    def get_rows(self, layout, budgets=None):
+        cube = evaluate_layout(compile_layout(layout, COMPANY), PERIODS, get_test_rows(), budgets)
+        return {row["account"]: row for row in cube.to_rows("INR") if row["account"]}
+
+    def test_compile_layout(self):
+        layout = compile_layout(MONTHLY_ACTUAL_VS_BUDGET, COMPANY)
+
+        self.assertEqual(
+            [line.label for line in layout.lines if line.kind != SPACER],
+            [
+                "Revenue",
+                "Cost of Goods Sold",
+                "Gross Profit",
+                "Operating Expenses",
+                "Other Expenses",
+                "Employees Benefit Expenses - TM",
+                "Administrative Expenses - TM",
+                "EBITDA",
+                "Depreciation & Amortisation Expenses",
+                "EBIT",
+                "Finance Cost",
+                "Profit Before Tax",
+                "Profit for the year",
+            ],
+        )
+        self.assertEqual(layout.weights.shape, (len(layout.lines), len(layout.accounts)))
+
+    def test_actual_lines(self):
+        rows = self.get_rows(MONTHLY_ACTUAL_VS_BUDGET)
+
+        expected = {
+            "Revenue": (1100, 1650),
+            "Cost of Goods Sold": (400, 600),
+            "Gross Profit": (700, 1050),
+            "Operating Expenses": (350, 400),
+            "Other Expenses": (10, 20),
+            # gross profit less the operating expense lines shown
+            "EBITDA": (450, 750),
+            "EBIT": (390, 690),
+            "Profit Before Tax": (350, 650),
+            # income less every expense root
+            "Profit for the year": (340, 630),
+        }
+        for label, (january, february) in expected.items():
+            self.assertEqual((rows[label]["jan_2025"], rows[label]["feb_2025"]), (january, february), label)
+
+        self.assertEqual(rows["Revenue"]["total"], 2750)
+        self.assertEqual(rows["Employees Benefit Expenses - TM"]["account_name"], "Employees Benefit Expenses")
+
+    def test_budget_lines(self):
+        rows = self.get_rows(MONTHLY_ACTUAL_VS_BUDGET, BUDGETS)
+
+        self.assertEqual(rows["Revenue"]["jan_2025_budget"], 900)
+        self.assertEqual(rows["Revenue"]["jan_2025_variance"], 200)
+        self.assertAlmostEqual(rows["Revenue"]["jan_2025_achivement"], 200 / 1100 * 100)
+        self.assertEqual(rows["Gross Profit"]["jan_2025_budget"], 400)
+        self.assertEqual(rows["Gross Profit"]["feb_2025_budget"], 1500)
+        # not budgeted
+        self.assertEqual(rows["Profit for the year"]["jan_2025_budget"], 0)
+
+    def test_ratio_lines(self):
+        rows = self.get_rows(PRODUCTIVE)
+
+        self.assertEqual(rows["COS Margin"]["jan_2025"], "40.00%")
+        self.assertEqual(rows["COS Margin"]["indent"], 0.0)
+        self.assertEqual(rows["HR Margin"]["feb_2025"], "13.33%")
+        self.assertEqual(rows["Admin Cost Margin"]["jan_2025"], "5.00%")
+        # no selling accounts in the chart
+        self.assertEqual(rows["Appointment Generation & Markerting"]["jan_2025"], "0.00%")
+
+
+class TestPLCube(FrappeTestCase):
+    def get_cube(self):
+        lines = [
+            frappe._dict(label="Revenue", indent=0.0, kind=AMOUNT, row={}),
+            frappe._dict(label="Costs", indent=0.0, kind=AMOUNT, row={}),
+            frappe._dict(label=None, indent=0.0, kind=SPACER, row={}),
+            frappe._dict(label="Margin", indent=0.0, kind=RATIO, row={}),
+        ]
+        return PLCube(PERIODS, lines)
+
+    def test_variance_without_actuals(self):
+        cube = self.get_cube()
+        cube.values[0, :, ACTUAL] = [100, 0]
+        cube.values[0, :, BUDGET] = [80, 50]
+        cube.compute_variance()
+
+        self.assertEqual(cube.values[0, :, VARIANCE].tolist(), [20, -50])
+        self.assertEqual(cube.values[0, :, ACHIEVEMENT].tolist(), [20, 0])
+
+    def test_ratio_without_denominator(self):
+        cube = self.get_cube()
+        cube.values[0, :, ACTUAL] = [200, 0]
+        cube.values[1, :, ACTUAL] = [50, 30]
+        cube.values[0, :, BUDGET] = [100, 100]
+        cube.values[1, :, BUDGET] = [40, 40]
+        cube.compute_variance()
+        cube.set_ratio(3, [1], [0])
+
+        self.assertEqual(cube.values[3, :, ACTUAL].tolist(), [25, 0])
+        self.assertEqual(cube.values[3, :, BUDGET].tolist(), [40, 40])
+        # no ratio of the variances
+        self.assertEqual(cube.values[3, :, VARIANCE].tolist(), [0, 0])
+
+        rows = cube.to_rows()
+        self.assertEqual(rows[3]["jan_2025_budget"], "40.00%")
+        self.assertIsNone(rows[3]["jan_2025_variance"])
+        self.assertIsNone(rows[3]["jan_2025_achivement"])
+
+    def test_to_rows(self):
+        cube = self.get_cube()
+        cube.values[0, :, ACTUAL] = [200, 100]
+        rows = cube.to_rows("INR", measures=(ACTUAL,))
+
+        self.assertEqual(rows[0]["total"], 300)
+        self.assertEqual(rows[0]["currency"], "INR")
+        self.assertNotIn("jan_2025_budget", rows[0])
+        self.assertEqual(rows[2], {"account": None, "account_name": None})
+        self.assertEqual(rows[3]["jan_2025"], "0.00%")
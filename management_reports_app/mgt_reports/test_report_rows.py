@@ -0,0 +1,114 @@
+# Copyright (c) 2025, kunleadenuga and contributors
+# For license information, please see license.txt
+
+import json
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from management_reports_app.mgt_reports import report_rows
+from management_reports_app.mgt_reports.item_variance import ITEM_CODE, QTY, new_item_code_variance
+from management_reports_app.mgt_reports.report_rows import get_rows
+
+REPORT_NAME = "Item Budget Variance Report"
+ROWS_CACHE_KEY = "mgt_reports_result|_test_rows"
+
+# item group -> total, in the order of the source
+TOTALS = {"A": 30, "B": 50, "C": 30, "D": 10, "E": 50}
+
+PLAN = frappe._dict(periods=[frappe._dict(fiscal_year="2025", label="2025")], fiscal_years=["2025"], is_yearly=True)
+
+
+@patch("frappe.has_permission", lambda *args, **kwargs: True)
+@patch.object(report_rows, "get_report_doc", lambda report_name: frappe._dict(ref_doctype="Sales Invoice"))
+@patch.object(report_rows, "get_rows_cache_key", lambda report_name, filters: ROWS_CACHE_KEY)
+class TestReportRows(FrappeTestCase):
+    def setUp(self):
+        frappe.cache().delete_value(ROWS_CACHE_KEY)
+        self.calls = []
+
+    def get_source_rows(self, filters):
+        self.calls.append(filters)
+        return frappe._dict(
+            columns=[{"fieldname": "item_group"}, {"fieldname": "total"}],
+            rows=[[item_group, total] for item_group, total in TOTALS.items()],
+            sort_values=list(TOTALS.values()),
+            totals=["Total", sum(TOTALS.values())],
+        )
+
+    def get_rows(self, **kwargs):
+        with patch.dict(report_rows.ROW_SOURCES, {REPORT_NAME: self.get_source_rows}):
+            return get_rows(REPORT_NAME, json.dumps({"company": "_Test Company", "top_n": 5}), **kwargs)
+
+    def test_pages_by_position(self):
+        page = self.get_rows(start=0, page_length=2)
+        self.assertEqual([row[0] for row in page["rows"]], ["B", "E"])
+        self.assertEqual(page["next"], [50, "E"])
+        self.assertEqual(page["total_count"], 5)
+        self.assertEqual(page["totals"], ["Total", 170])
+
+        page = self.get_rows(start=4, page_length=2)
+        self.assertEqual([row[0] for row in page["rows"]], ["D"])
+        self.assertIsNone(page["next"])
+
+        self.assertEqual(self.get_rows(start=10)["rows"], [])
+
+    def test_pages_by_key(self):
+        item_groups, after = [], None
+        while True:
+            page = self.get_rows(page_length=2, after=json.dumps(after) if after else None)
+            item_groups.extend(row[0] for row in page["rows"])
+            after = page["next"]
+            if not after:
+                break
+
+        # total descending, item group on equal totals
+        self.assertEqual(item_groups, ["B", "E", "A", "C", "D"])
+
+    def test_rows_computed_once(self):
+        self.get_rows(start=0, page_length=2)
+        self.get_rows(start=2, page_length=2)
+
+        self.assertEqual(len(self.calls), 1)
+        # pages are the whole report, not its top N
+        self.assertEqual(self.calls[0].top_n, 0)
+
+    def test_page_length(self):
+        self.assertEqual(len(self.get_rows(page_length=0)["rows"]), 1)
+        with patch.object(report_rows, "MAX_PAGE_LENGTH", 3):
+            self.assertEqual(len(self.get_rows(page_length=100)["rows"]), 3)
+
+    def test_other_reports(self):
+        self.assertRaises(frappe.ValidationError, get_rows, "General Ledger")
+
+    def test_item_code_pages(self):
+        ranked = [("6.000000000", "ITEM-3"), ("4.000000000", "ITEM-1"), ("2.000000000", "ITEM-2")]
+
+        def get_item_code_page(filters, plan, order_by, limit, start=0, after=None):
+            self.assertEqual(order_by, QTY)
+            if after:
+                start = ranked.index(tuple(after)) + 1
+            page = ranked[start : start + limit]
+            variance = {item_code: new_item_code_variance(plan) for total, item_code in page}
+            for total, item_code in page:
+                variance[item_code][QTY] = [float(total)]
+            return frappe._dict(ranked=page, variance=variance)
+
+        totals = frappe._dict(new_item_code_variance(PLAN), count=3, qty=[12.0])
+        with (
+            patch.object(report_rows, "PeriodPlan", lambda filters: PLAN),
+            patch.object(report_rows, "get_item_code_page", get_item_code_page),
+            patch.object(report_rows, "get_item_code_totals", lambda filters, plan, count=False: totals),
+        ):
+            filters = json.dumps({"company": "_Test Company", "group_by": ITEM_CODE})
+            page = get_rows("Item Qty Budget Based Report", filters, page_length=2)
+            self.assertEqual([row[0] for row in page["rows"]], ["ITEM-3", "ITEM-1"])
+            self.assertEqual(page["next"], ["4.000000000", "ITEM-1"])
+            self.assertEqual(page["total_count"], 3)
+            self.assertEqual(page["totals"][:3], ["Total", 0.0, 12.0])
+
+            page = get_rows("Item Qty Budget Based Report", filters, page_length=2, after=json.dumps(page["next"]))
+            self.assertEqual([row[0] for row in page["rows"]], ["ITEM-2"])
+            self.assertIsNone(page["next"])
+            self.assertIsNone(page["start"])
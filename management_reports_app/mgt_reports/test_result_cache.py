@@ -0,0 +1,128 @@
+# Copyright (c) 2025, kunleadenuga and contributors
+# For license information, please see license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from management_reports_app.mgt_reports.result_cache import (
+    GL_SOURCES,
+    ResultPending,
+    SingleFlightLock,
+    cache_report_result,
+    clear_result_cache,
+    get_result_cache_key,
+    normalize_filters,
+)
+
+REPORT_NAME = "_Test MGT Report"
+WATERMARK = (("2025-01-31 10:00:00",), (None,), ("2024-12-01 09:00:00",))
+
+
+@patch("management_reports_app.mgt_reports.result_cache.get_permission_fingerprint", lambda: "fingerprint")
+@patch("management_reports_app.mgt_reports.result_cache.get_data_watermark", lambda sources, company: WATERMARK)
+class TestResultCache(FrappeTestCase):
+    def setUp(self):
+        clear_result_cache()
+
+    def get_key(self, filters):
+        return get_result_cache_key(REPORT_NAME, GL_SOURCES, frappe._dict(filters))
+
+    def test_normalize_filters(self):
+        self.assertEqual(
+            normalize_filters(
+                {
+                    "company": "_Test Company",
+                    "cost_center": ["Main", "Branch"],
+                    "project": "",
+                    "finance_book": None,
+                    "accumulated_values": 0,
+                }
+            ),
+            {"company": "_Test Company", "cost_center": ["Branch", "Main"]},
+        )
+
+    def test_equal_selections_share_a_key(self):
+        self.assertEqual(
+            self.get_key({"company": "_Test Company", "cost_center": ["Main", "Branch"], "project": ""}),
+            self.get_key({"cost_center": ["Branch", "Main"], "company": "_Test Company"}),
+        )
+        self.assertNotEqual(
+            self.get_key({"company": "_Test Company", "cost_center": ["Main"]}),
+            self.get_key({"company": "_Test Company", "cost_center": ["Branch"]}),
+        )
+
+    def test_key_follows_watermark_and_permissions(self):
+        filters = {"company": "_Test Company"}
+        key = self.get_key(filters)
+
+        with patch(
+            "management_reports_app.mgt_reports.result_cache.get_data_watermark",
+            lambda sources, company: (("2025-02-01 08:00:00",),) + WATERMARK[1:],
+        ):
+            self.assertNotEqual(self.get_key(filters), key)
+
+        with patch(
+            "management_reports_app.mgt_reports.result_cache.get_permission_fingerprint", lambda: "other"
+        ):
+            self.assertNotEqual(self.get_key(filters), key)
+
+    def test_cached_result(self):
+        runs = []
+
+        @cache_report_result(REPORT_NAME, GL_SOURCES)
+        def execute(filters=None):
+            runs.append(filters)
+            return [], [len(runs)]
+
+        filters = {"company": "_Test Company", "from_fiscal_year": "2025"}
+        self.assertEqual(execute(filters), ([], [1]))
+        self.assertEqual(execute(dict(filters, project="")), ([], [1]))
+        self.assertEqual(len(runs), 1)
+
+        clear_result_cache()
+        self.assertEqual(execute(filters), ([], [2]))
+
+        # without a company the result is not cached
+        execute({})
+        execute({})
+        self.assertEqual(len(runs), 4)
+
+    def test_key_filters(self):
+        runs = []
+
+        def get_key_filters(filters):
+            return frappe._dict(filters, as_of_date=filters.as_of_date or "2025-01-31")
+
+        @cache_report_result(REPORT_NAME, GL_SOURCES, get_key_filters)
+        def execute(filters=None):
+            runs.append(dict(filters))
+            return [], []
+
+        execute({"company": "_Test Company"})
+        execute({"company": "_Test Company", "as_of_date": "2025-01-31"})
+        execute({"company": "_Test Company", "as_of_date": "2025-02-28"})
+
+        # the default only goes into the key, execute gets the filters as submitted
+        self.assertEqual(
+            runs, [{"company": "_Test Company"}, {"company": "_Test Company", "as_of_date": "2025-02-28"}]
+        )
+
+    def test_short_wait(self):
+        runs = []
+
+        @cache_report_result(REPORT_NAME, GL_SOURCES)
+        def execute(filters=None):
+            runs.append(filters)
+            return [], []
+
+        # another run holds the key and does not finish
+        with (
+            patch.object(SingleFlightLock, "acquire", lambda self: False),
+            patch("management_reports_app.mgt_reports.result_cache.SINGLE_FLIGHT_SHORT_WAIT", 0),
+            patch.dict(frappe.flags, {"mgt_reports_short_wait": True}),
+        ):
+            self.assertRaises(ResultPending, execute, {"company": "_Test Company"})
+
+        self.assertEqual(runs, [])
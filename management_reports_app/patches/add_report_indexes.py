@@ -0,0 +1,5 @@
+from management_reports_app.mgt_reports.report_indexes import add_report_indexes
+
+
+def execute():
+    add_report_indexes()
@@ -0,0 +1,5 @@
+from management_reports_app.mgt_reports.item_sales import rebuild_item_group_sales
+
+
+def execute():
+    rebuild_item_group_sales()
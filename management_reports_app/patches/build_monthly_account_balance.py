@@ -0,0 +1,5 @@
+from management_reports_app.mgt_reports.account_balance import rebuild_account_balances
+
+
+def execute():
+    rebuild_account_balances()
@@ -0,0 +1,5 @@
+from management_reports_app.mgt_reports.report_indexes import drop_report_indexes
+
+
+def execute():
+    drop_report_indexes()
@@ -0,0 +1,72 @@
+// Copyright (c) 2025, kunleadenuga and contributors
+// For license information, please see license.txt
+
+// Progress bar for runs of the MGT reports, fed by the mgt_report_progress events of
+// mgt_reports/progress.py. A background (prepared report) run can be cancelled from the
+// report page, and is cancelled on its own once the filters it was started for change.
+
+frappe.provide("management_reports_app.report_progress");
+
+management_reports_app.report_progress = {
+	setup: function (report) {
+		if (report.__mgt_report_progress) return;
+		report.__mgt_report_progress = true;
+
+		frappe.realtime.on("mgt_report_progress", (data) => {
+			if (data.report !== report.report_name || frappe.get_route()[1] !== report.report_name) {
+				return;
+			}
+
+			if (data.prepared_report && !this.is_current(report, data.filters)) {
+				this.cancel(report, data.prepared_report);
+				return;
+			}
+
+			if (data.done >= data.total) {
+				frappe.hide_progress();
+				this.remove_cancel_button(report);
+				return;
+			}
+
+			frappe.show_progress(__(report.report_name), data.done, data.total, __(data.description));
+			if (data.prepared_report) {
+				this.add_cancel_button(report, data.prepared_report);
+			}
+		});
+	},
+
+	is_current: function (report, filters) {
+		// only the filters of the page: a report may add derived ones to those it publishes
+		const current = report.get_filter_values() || {};
+		return (report.filters || [])
+			.map((filter) => filter.df.fieldname)
+			.every(
+				(fieldname) =>
+					String((filters || {})[fieldname] ?? "") === String(current[fieldname] ?? "")
+			);
+	},
+
+	add_cancel_button: function (report, prepared_report) {
+		if (report.__mgt_cancel_button === prepared_report) return;
+
+		this.remove_cancel_button(report);
+		report.page.add_inner_button(__("Cancel Run"), () => this.cancel(report, prepared_report));
+		report.__mgt_cancel_button = prepared_report;
+	},
+
+	remove_cancel_button: function (report) {
+		if (!report.__mgt_cancel_button) return;
+
+		report.page.remove_inner_button(__("Cancel Run"));
+		report.__mgt_cancel_button = null;
+	},
+
+	cancel: function (report, prepared_report) {
+		frappe.hide_progress();
+		this.remove_cancel_button(report);
+		frappe.call({
+			method: "management_reports_app.mgt_reports.progress.cancel_report_run",
+			args: { prepared_report: prepared_report },
+		});
+	},
+};